@@ -0,0 +1,119 @@
+"""
+Local stand-in for the OpenAI embeddings and chat completions endpoints.
+
+Embeddings are deterministic unit vectors seeded by a hash of the input text,
+so repeated runs build identical indexes.  Chat replies are canned; prompts
+containing "[id N]" candidates get a rerank-shaped JSON reply.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_vector(text: str, dim: int) -> list:
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    v = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = sum(x * x for x in v) ** 0.5
+    return [x / norm for x in v]
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def chat_reply(prompt: str) -> str:
+    ids = [int(i) for i in re.findall(r"\[id (\d+)\]", prompt)]
+    if ids:
+        return json.dumps({"results": [
+            {"id": i, "score": 90 - 7 * i, "keep": i < 6,
+             "rationale": f"Candidate {i} works on closely related methods."}
+            for i in ids
+        ]})
+    return "This professor's work matches the query's imaging and analysis themes."
+
+
+class FakeOpenAIServer:
+    """Run with `with FakeOpenAIServer(latency=0.2) as base_url: …`."""
+
+    def __init__(self, latency: float = 0.0, dim: int = 256, port: int = 0,
+                 throttle_every: int = 0):
+        self.latency = latency
+        self.dim = dim
+        self.throttle_every = throttle_every    # answer every Nth embeddings call with a 429
+        self.requests = {"embeddings": 0, "chat": 0}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(server.latency)
+                if self.path.endswith("/embeddings"):
+                    server.requests["embeddings"] += 1
+                    if server.throttle_every and server.requests["embeddings"] % server.throttle_every == 0:
+                        self.send_response(429)
+                        self.send_header("Retry-After", "0.1")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                    inputs = [i if isinstance(i, str) else json.dumps(i) for i in inputs]
+                    reply = {
+                        "object": "list", "model": body.get("model"),
+                        "data": [{"object": "embedding", "index": n,
+                                  "embedding": fake_vector(t, server.dim)}
+                                 for n, t in enumerate(inputs)],
+                        "usage": {"prompt_tokens": sum(map(count_tokens, inputs)),
+                                  "total_tokens": sum(map(count_tokens, inputs))},
+                    }
+                elif self.path.endswith("/chat/completions"):
+                    server.requests["chat"] += 1
+                    prompt = "\n".join(m["content"] for m in body["messages"])
+                    content = chat_reply(prompt)
+                    reply = {
+                        "id": "chatcmpl-fake", "object": "chat.completion",
+                        "created": int(time.time()), "model": body.get("model"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": {"prompt_tokens": count_tokens(prompt),
+                                  "completion_tokens": count_tokens(content),
+                                  "total_tokens": count_tokens(prompt) + count_tokens(content)},
+                    }
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(reply).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Serve fake OpenAI endpoints")
+    ap.add_argument("--port", type=int, default=8799)
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--dim", type=int, default=256)
+    args = ap.parse_args()
+    with FakeOpenAIServer(args.latency, args.dim, args.port) as url:
+        print(f"Fake OpenAI at {url} – set OPENAI_BASE_URL to use it (Ctrl-C to stop)")
+        threading.Event().wait()
@@ -0,0 +1,55 @@
+"""Local HTTP server of synthetic faculty pages, with ETags and configurable latency."""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synth import faculty_page
+
+
+class FixtureServer:
+    """Serves /faculty/<n> pages; any other path is a 404, like the dead links we crawl."""
+
+    def __init__(self, latency: float = 0.05, port: int = 0):
+        self.latency = latency
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.hits += 1
+                time.sleep(server.latency)
+                if not self.path.startswith("/faculty/"):
+                    self._reply(404, b"Not Found")
+                    return
+                body = faculty_page(self.path.rsplit("/", 1)[-1]).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self._reply(304, b"", etag)
+                else:
+                    self._reply(200, body, etag)
+
+            def _reply(self, status, body, etag=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,92 @@
+"""
+Recall@k vs. latency vs. size for each vector-index setting, measured against
+exact full-width search over the same vectors.
+
+Vectors come from an index already built by build_index.py (read back from its
+embedding cache, so nothing is embedded).  `--queries` chunks are held out of
+the index and used as queries.  Truncation numbers are only meaningful for a
+real text-embedding-3 index; the fake embeddings of benchmarks.run have no
+Matryoshka structure.
+
+    python -m benchmarks.index_eval --index-dir vector_index --out index_eval.json
+"""
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from faiss_index import KINDS, IndexSpec, build_faiss_index, truncate
+from index_store import (INDEX_DIR, EmbeddingCache, chunk_key, current_version,
+                         load_vectorstore, version_dir)
+
+
+def load_vectors(index_dir: str = INDEX_DIR) -> np.ndarray:
+    """Full-width, normalized chunk vectors of the CURRENT version, in index order."""
+    path = version_dir(current_version(index_dir), index_dir)
+    model = json.loads((path / "manifest.json").read_text("utf-8"))["model"]
+    store = load_vectorstore(path, None)
+    cache = EmbeddingCache(f"{index_dir}/embeddings")
+    ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+    vectors = np.stack([cache.get(chunk_key(store.docstore.search(i).page_content, model))
+                        for i in ids])
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def evaluate(base, queries, truth, spec: IndexSpec, k: int) -> dict:
+    start = time.perf_counter()
+    x = truncate(base, spec.dim)
+    index = build_faiss_index(x, spec)
+    index.add(x)
+    build_seconds = time.perf_counter() - start
+
+    q = truncate(queries, spec.dim)
+    latencies, hits = [], 0
+    for row, expected in zip(q, truth):
+        t0 = time.perf_counter()
+        _, found = index.search(row[None], k)
+        latencies.append(time.perf_counter() - t0)
+        hits += len(set(found[0]) & set(expected))
+    return {
+        "setting": spec.label,
+        f"recall@{k}": round(hits / (k * len(queries)), 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "index_mb": round(faiss.serialize_index(index).nbytes / 2**20, 2),
+        "build_s": round(build_seconds, 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--index-dir", default=INDEX_DIR)
+    ap.add_argument("--kinds", default=",".join(KINDS))
+    ap.add_argument("--dims", default="0,1024,512,256", help="0 = full width")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="also write the rows as JSON")
+    args = ap.parse_args()
+
+    vectors = load_vectors(args.index_dir)
+    held_out = np.random.RandomState(args.seed).permutation(len(vectors))
+    n_q = min(args.queries, len(vectors) // 5)
+    queries, base = vectors[held_out[:n_q]], vectors[held_out[n_q:]]
+    truth = np.argsort(-(queries @ base.T), axis=1)[:, :args.k]
+    print(f"{len(base)} vectors × {base.shape[1]} dims, {n_q} held-out queries")
+
+    rows = []
+    for kind in args.kinds.split(","):
+        for dim in (int(d) or None for d in args.dims.split(",")):
+            for float16 in ((False,) if kind == "ivfpq" else (False, True)):
+                row = evaluate(base, queries, truth, IndexSpec(kind, dim, float16), args.k)
+                rows.append(row)
+                print("  ".join(f"{k}={v}" for k, v in row.items()))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Offline, reproducible timing and memory report for each pipeline stage:
+crawl (web.py's crawler), combine (combine.py), index build, index load,
+search and facet-filtered search.  OpenAI is replaced by benchmarks.fake_openai
+and faculty sites by benchmarks.fixture_server, so nothing costs money or
+touches the network.
+
+    python -m benchmarks.run --scale 10 --out bench_report.json
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import re
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from benchmarks.fake_openai import FakeOpenAIServer
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.synth import TOPICS, _rng, make_dataset
+
+QUERY_WORDS = 24
+
+
+@contextmanager
+def stage(name, report, **info):
+    """Time a block and record its Python-heap peak (tracemalloc) and process max RSS."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    row = {"stage": name, **info}
+    try:
+        yield row
+    finally:
+        row["seconds"] = round(time.perf_counter() - start, 3)
+        row["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+        row["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        report.append(row)
+
+
+def print_report(report):
+    fixed = ("stage", "seconds", "peak_mb", "max_rss_mb")
+    for row in report:
+        extra = "  ".join(f"{k}={v}" for k, v in row.items() if k not in fixed)
+        print(f"  {row['stage']:<14} {row['seconds']:>8.2f}s  peak {row['peak_mb']:>7.1f} MB  "
+              f"rss {row['max_rss_mb']:>7.1f} MB  {extra}")
+
+
+def bench_crawl(work, report):
+    from crawler import Crawler
+    from fetch_cache import FetchCache
+
+    with open(os.path.join(work, "Data.csv"), newline="", encoding="utf-8") as f:
+        urls = [u for row in csv.DictReader(f)
+                for u in re.findall(r"https?://\S+", row["Personal or lab webpage (if available):"])]
+    cache_path = os.path.join(work, "fetch_cache.sqlite")
+    for label in ("crawl_cold", "crawl_warm"):
+        crawler = Crawler(concurrency=32, per_host_rate=200, per_host_burst=50,
+                          backoff_factor=0.01, cache=FetchCache(cache_path))
+        with stage(label, report, urls=len(urls)) as row:
+            results = crawler.crawl(urls)
+        row["urls_per_s"] = round(len(urls) / row["seconds"], 1) if row["seconds"] else None
+        row["ok"] = sum(r.ok for r in results.values())
+
+
+def bench_combine(work, report):
+    from combine import SOURCE_FILES, merge_source
+    from corpus_store import CorpusStore
+    from name_resolution import NameResolver
+
+    store = CorpusStore(os.path.join(work, "corpus.sqlite"))
+    with stage("combine", report):
+        resolver = NameResolver.from_csv(os.path.join(work, "Data.csv"))
+        for source, file_name in SOURCE_FILES:
+            merge_source(store, resolver, source, os.path.join(work, file_name))
+    store.close()
+
+
+def bench_index(work, report, base_url):
+    from langchain_openai import OpenAIEmbeddings
+    from build_index import load_documents
+    from index_store import build_artifact, load_artifact
+
+    make_embeddings = lambda model: OpenAIEmbeddings(
+        model=model, base_url=base_url, api_key="fake", check_embedding_ctx_length=False)
+    index_dir = os.path.join(work, "vector_index")
+
+    with stage("chunk", report) as row:
+        documents = load_documents(os.path.join(work, "Data.csv"),
+                                   os.path.join(work, "corpus.sqlite"), report=row)
+    with stage("build_index", report, chunks=len(documents)) as row:
+        build_artifact(documents, make_embeddings("text-embedding-3-large"),
+                       "text-embedding-3-large", index_dir)
+    with stage("load_index", report):
+        artifact = load_artifact(make_embeddings, index_dir)
+    embedding = artifact.manifest["embedding"]
+    row.update({k: embedding[k] for k in ("chunks_per_s", "tokens_per_s", "retries")})
+    return artifact
+
+
+def make_queries(n):
+    rng = _rng("queries")
+    return [" ".join(rng.choice(TOPICS) for _ in range(QUERY_WORDS // 2)) for _ in range(n)]
+
+
+def percentiles(latencies, row):
+    row["p50_ms"] = round(statistics.median(latencies) * 1000, 2)
+    row["p95_ms"] = round(sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000, 2)
+
+
+def bench_facets(artifact, report, n_queries, n=10, fanout=3):
+    """
+    Facet-filtered professor search: the id-set prefilter used by the app vs.
+    searching everything and filtering the top n × `fanout` afterwards.  Query
+    vectors are embedded up front so only index work is timed.  Post-filtering
+    can come back short; `avg_results` shows by how much.
+    """
+    professors, bm25, facets = artifact.professors, artifact.bm25, artifact.facets
+    queries = make_queries(n_queries)
+    qvecs = artifact.vectorstore.embedding_function.embed_documents(queries)
+    schools = facets.facets["School:"]
+    # the largest and the smallest school with at least n professors
+    big = max(schools, key=lambda s: len(schools[s]))
+    small = min((s for s in schools if len(schools[s]) >= n), key=lambda s: len(schools[s]))
+
+    for label, school in (("big", big), ("small", small)):
+        selection = facets.select({"School:": [school]})
+        for method in ("prefilter", "postfilter"):
+            latencies, returned = [], []
+            with stage(f"facet_{label}_{method}", report, school=school,
+                       share=round(len(selection.ids) / len(professors.ids), 3)) as row:
+                for q, qvec in zip(queries, qvecs):
+                    t0 = time.perf_counter()
+                    if method == "prefilter":
+                        found = professors.search(qvec, n, allowed=selection.professors)
+                        lexical = bm25.search(q, n * 30, selection.chunk_ids)
+                    else:
+                        found = [f for f in professors.search(qvec, n * fanout)
+                                 if f[0] in selection.ids][:n]
+                        lexical = [h for h in bm25.search(q, n * 30 * fanout)
+                                   if h[0] in selection.chunk_ids][:n * 30]
+                    latencies.append(time.perf_counter() - t0)
+                    returned.append(len(found))
+            percentiles(latencies, row)
+            row["avg_results"] = round(statistics.mean(returned), 1)
+
+
+def bench_search(artifact, report, base_url, n_queries):
+    from langchain_openai import ChatOpenAI
+    from retrieval import HybridRetriever
+    from rerank import LLMReranker, rerank
+
+    llm = ChatOpenAI(model="gpt-4o", base_url=base_url, api_key="fake")
+    reranker = LLMReranker(llm)
+    queries = make_queries(n_queries)
+
+    for mode in ("hybrid", "lexical"):
+        retriever = HybridRetriever(artifact.vectorstore, artifact.bm25, mode=mode,
+                                    professors=artifact.professors)
+        latencies = []
+        with stage(f"search_{mode}", report, queries=n_queries) as row:
+            for q in queries:
+                t0 = time.perf_counter()
+                rerank(reranker, q, retriever.search_professors(q, 10))
+                latencies.append(time.perf_counter() - t0)
+        percentiles(latencies, row)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", type=float, default=10, help="multiple of the real Data.csv size")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--embed-latency", type=float, default=0.05)
+    ap.add_argument("--chat-latency", type=float, default=0.2)
+    ap.add_argument("--page-latency", type=float, default=0.02)
+    ap.add_argument("--work-dir", help="keep generated data here instead of a temp dir")
+    ap.add_argument("--out", help="write the report as JSON")
+    args = ap.parse_args()
+
+    report = []
+    work = args.work_dir or tempfile.mkdtemp(prefix="rc-bench-")
+    with FixtureServer(args.page_latency) as site, \
+            FakeOpenAIServer(args.embed_latency) as embed_url, \
+            FakeOpenAIServer(args.chat_latency) as chat_url:
+        print(f"Benchmark scale {args.scale}x, seed {args.seed}, data in {work}")
+        with stage("synth", report) as row:
+            row["rows"] = make_dataset(work, args.scale, args.seed, web_base_url=site)
+        bench_crawl(work, report)
+        bench_combine(work, report)
+        artifact = bench_index(work, report, embed_url)
+        bench_search(artifact, report, chat_url, args.queries)
+        bench_facets(artifact, report, args.queries)
+
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "stages": report}, f, indent=2)
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic Data.csv and source JSONs shaped like ours, at any multiple of the real size."""
+import csv
+import hashlib
+import json
+import os
+import random
+
+BASE_ROWS = 162       # rows in the real Data.csv
+
+FIRST = ["Wei", "Jing", "Li", "Hui", "Yan", "Xin", "Jun", "Ming", "Ying", "Hong",
+         "Lei", "Qian", "Yu", "Chen", "Fang", "Tao", "Bo", "Lin", "Jie", "Ran"]
+SYLLABLES = ["zh", "an", "ang", "ch", "en", "li", "wu", "xu", "hu", "yi", "ao", "ou"]
+SCHOOLS = {
+    "School of Medicine": ["Radiology", "Pediatrics", "Neurology", "Ophthalmology", "Genetics"],
+    "McKelvey School of Engineering": ["Biomedical Engineering", "Computer Science & Engineering",
+                                       "Electrical & Systems Engineering"],
+    "Arts & Sciences": ["Physics", "Chemistry", "Biology", "Economics", "Mathematics"],
+    "Olin Business School": ["Marketing", "Finance"],
+}
+TOPICS = [
+    "optical coherence tomography", "photonic chip", "heart organoid", "single-cell sequencing",
+    "deep learning", "graph neural networks", "electrocatalysis", "battery materials",
+    "causal inference", "federated learning", "cryo-electron microscopy", "gene regulation",
+    "tumor microenvironment", "neural circuits", "quantum materials", "health economics",
+    "medical imaging", "natural language processing", "climate modeling", "drug delivery",
+]
+NAV = ("Skip to main content\nHome\nPeople\nResearch\nNews\nEvents\nContact\n"
+       "Home\nPeople\nResearch\nNews\nEvents\nContact\n")
+
+
+def _rng(*seed) -> random.Random:
+    return random.Random(hashlib.sha256(repr(seed).encode()).digest())
+
+
+def _letters(i: int) -> str:
+    s = ""
+    while True:
+        s = chr(ord("a") + i % 26) + s
+        i = i // 26 - 1
+        if i < 0:
+            return s
+
+
+def paragraph(rng, sentences=6) -> str:
+    return " ".join(
+        f"We study {rng.choice(TOPICS)} and {rng.choice(TOPICS)} "
+        f"with applications to {rng.choice(TOPICS)}." for _ in range(sentences))
+
+
+def faculty_page(slug: str) -> str:
+    """HTML for one faculty page, identical on every request."""
+    rng = _rng("page", slug)
+    body = "".join(f"<p>{paragraph(rng)}</p>" for _ in range(rng.randint(2, 6)))
+    nav = "".join(f"<li>{line}</li>" for line in NAV.splitlines())
+    return (f"<html><body><nav><ul>{nav}</ul></nav><h1>Faculty {slug}</h1>{body}"
+            f"<footer>{nav}</footer></body></html>")
+
+
+def make_dataset(out_dir: str, scale: float = 10, seed: int = 0, web_base_url: str = None) -> int:
+    """
+    Write Data.csv, all_scholars.json, CV.json and web_data.json under `out_dir`
+    for `BASE_ROWS * scale` people.  With `web_base_url`, webpage cells point
+    at a fixture_server.  Returns the number of rows.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = _rng("dataset", seed)
+    n = int(BASE_ROWS * scale)
+    rows, scholars, cvs, web = [], {}, {}, {}
+    for i in range(n):
+        first = rng.choice(FIRST)
+        last = (rng.choice(SYLLABLES) + rng.choice(SYLLABLES) + _letters(i)).capitalize()
+        name = f"{first} {last}"
+        school = rng.choice(list(SCHOOLS))
+        url = f"{web_base_url}/faculty/{i}" if web_base_url else ""
+        if web_base_url and rng.random() < 0.05:
+            url = f"{web_base_url}/gone/{i}"          # dead link
+        rows.append({
+            "First Name:": first, "Last Name:": last,
+            "WashU Email Address:": f"{first[0].lower()}{last.lower()}@wustl.edu",
+            "School:": school, "Department:": rng.choice(SCHOOLS[school]),
+            "Title:": rng.choice(["Professor", "Associate Professor", "Assistant Professor"]),
+            "Personal or lab webpage (if available):": url,
+            "CV": f"{name} CV", "Google Scholar Names": f"{name} GS", "Other Info": "",
+            "Google Scholar Link": "",
+        })
+        if rng.random() < 0.25:
+            scholars[name] = "; ".join(
+                f"{rng.choice(TOPICS).title()} for {rng.choice(TOPICS)} (Cited by {rng.randint(0, 900)})"
+                for _ in range(rng.randint(10, 120)))
+        if rng.random() < 0.3:
+            cvs[f"{name} CV.pdf"] = "\n".join(
+                ["CURRICULUM VITAE", name, "EDUCATION", paragraph(rng, 2),
+                 "RESEARCH INTERESTS", paragraph(rng, 8), "PUBLICATIONS", paragraph(rng, 20)])
+        if rng.random() < 0.95:
+            web[name] = NAV + paragraph(rng, rng.randint(4, 12))
+
+    with open(os.path.join(out_dir, "Data.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    for file_name, data in [("all_scholars.json", scholars), ("CV.json", cvs),
+                            ("web_data.json", web)]:
+        with open(os.path.join(out_dir, file_name), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    return n
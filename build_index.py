@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+from langchain_core.documents import Document
+from langchain_openai import OpenAIEmbeddings
+
+from chunking import chunk_sources, is_heading
+from corpus_store import CORPUS_PATH, SOURCES, CorpusStore
+from dedup import drop_near_duplicates, strip_boilerplate
+import embedding_pipeline
+from faiss_index import KINDS, TRUNCATE_DIMS, IndexSpec
+from index_store import INDEX_DIR, KEEP_VERSIONS, build_artifact, sync_artifact
+from name_resolution import NameResolver, professor_id
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+
+def load_documents(csv_file='Data.csv', corpus_path=CORPUS_PATH, json_file='combined.json',
+                   dedup=True, report=None):
+    """
+    Chunk every professor's text into Documents carrying their Data.csv metadata
+    and the `source` (scholar / cv / web) and `section` each chunk came from.
+    Each source is chunked along its own structure (see chunking.py).
+    With `dedup`, site boilerplate is stripped before chunking and near-duplicate
+    chunks are dropped after; the savings are added to the `report` dict.
+    """
+    report = {} if report is None else report
+    # Load the CSV file with professor metadata.
+    df = pd.read_csv(csv_file)
+    # Create a full name column.
+    df['name'] = df['First Name:'] + ' ' + df['Last Name:']
+    # The professor id every source was resolved to by combine.py.
+    df['professor_id'] = [professor_id(email, name)
+                          for email, name in zip(df['WashU Email Address:'], df['name'])]
+    # Build metadata DataFrame (one row per professor).
+    metadata_columns = ['professor_id', 'name', 'WashU Email Address:', 'School:',
+                        'Department:', 'Title:']
+    professors_metadata = df[metadata_columns].drop_duplicates('professor_id')
+
+    # Load the texts, one {professor id: text} per source: the corpus store
+    # written by combine.py if present, otherwise the exported combined.json
+    # (whose sources are already merged, so it is chunked as plain text).
+    if os.path.exists(corpus_path):
+        store = CorpusStore(corpus_path)
+        texts = {source: store.source_texts(source) for source in SOURCES}
+        store.close()
+        if dedup:
+            # Boilerplate is judged across web pages only, so that CV section
+            # headings shared by many professors are kept.
+            texts["web"], report["boilerplate_lines"], report["boilerplate_tokens"] = \
+                strip_boilerplate(texts["web"])
+    else:
+        # keyed by professor id, or by name in exports from before ids
+        resolver = NameResolver.from_csv(csv_file)
+        texts = {"text": {}}
+        with open(json_file, 'r', encoding='utf-8') as f:
+            for key, text in json.load(f).items():
+                pid = resolver.resolve_or_add(key, text).professor_id
+                texts["text"][pid] = f"{texts['text'].get(pid, '')}\n\n{text}".strip()
+        if dedup:
+            # web and CV text are mixed here, so keep the CV section headings
+            # (PUBLICATIONS, ...) that every CV repeats and the chunker splits at
+            texts["text"], report["boilerplate_lines"], report["boilerplate_tokens"] = \
+                strip_boilerplate(texts["text"],
+                                  exempt=lambda line: is_heading(" ".join(line.split())))
+
+    # Chunk every source in one pass, then join the chunks to the professors
+    # by id (the merge keeps Data.csv order, then source order).
+    chunks = professors_metadata.merge(chunk_sources(texts), left_on="professor_id",
+                                       right_on="key")
+
+    documents = [
+        Document(page_content=row["text"],
+                 metadata={**{c: row[c] for c in metadata_columns},
+                           "source": row["source"], "section": row["section"]})
+        for row in chunks.to_dict("records")
+    ]
+
+    if dedup:
+        documents, report["duplicate_chunks"], report["duplicate_tokens"] = \
+            drop_near_duplicates(documents)
+    report["chunks"] = len(documents)
+    return documents
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build the versioned search index served by main.py")
+    ap.add_argument("--csv", default="Data.csv")
+    ap.add_argument("--corpus", default=CORPUS_PATH)
+    ap.add_argument("--index-dir", default=INDEX_DIR)
+    ap.add_argument("--model", default=EMBEDDING_MODEL)
+    ap.add_argument("--sync", action="store_true",
+                    help="update CURRENT for only the professors that changed (keeps its index settings)")
+    ap.add_argument("--no-dedup", action="store_true",
+                    help="embed every chunk, without boilerplate / near-duplicate removal")
+    ap.add_argument("--index-type", default="flat", choices=KINDS,
+                    help="FAISS index type (see `python -m benchmarks.index_eval`)")
+    ap.add_argument("--dim", type=int, choices=TRUNCATE_DIMS,
+                    help="truncate vectors to this many dimensions (default: full width)")
+    ap.add_argument("--float16", action="store_true", help="store index vectors as float16")
+    ap.add_argument("--nprobe", type=int, default=8, help="IVF lists scanned per query")
+    ap.add_argument("--ef-search", type=int, default=64, help="HNSW search breadth")
+    ap.add_argument("--rpm", type=float, default=embedding_pipeline.RPM,
+                    help="embedding requests per minute allowed by our OpenAI tier")
+    ap.add_argument("--tpm", type=float, default=embedding_pipeline.TPM,
+                    help="embedding tokens per minute allowed by our OpenAI tier")
+    ap.add_argument("--concurrency", type=int, default=embedding_pipeline.CONCURRENCY)
+    ap.add_argument("--batch-tokens", type=int, default=embedding_pipeline.BATCH_TOKENS)
+    ap.add_argument("--keep-versions", type=int, default=KEEP_VERSIONS,
+                    help="versions kept in the index dir, CURRENT included (older ones are deleted)")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    dedup = {}
+    documents = load_documents(args.csv, args.corpus, dedup=not args.no_dedup, report=dedup)
+    print(f"{len(documents)} chunks from {len({d.metadata['professor_id'] for d in documents})} professors "
+          f"({time.perf_counter() - start:.1f}s)")
+    if not args.no_dedup:
+        print(f"dedup: {dedup['boilerplate_lines']} boilerplate lines "
+              f"(~{dedup['boilerplate_tokens']} tokens) stripped, "
+              f"{dedup['duplicate_chunks']} near-duplicate chunks "
+              f"(~{dedup['duplicate_tokens']} tokens) dropped")
+
+    spec = IndexSpec(args.index_type, args.dim, args.float16, args.nprobe, args.ef_search)
+    # the pipeline does its own batching and backoff, so the client must not retry too
+    embeddings = OpenAIEmbeddings(model=args.model, max_retries=0,
+                                  chunk_size=embedding_pipeline.BATCH_SIZE)
+    embed_options = {"rpm": args.rpm, "tpm": args.tpm, "concurrency": args.concurrency,
+                     "batch_tokens": args.batch_tokens}
+    extra_manifest = {"csv": args.csv, "dedup": dedup}
+    if args.sync:
+        version = sync_artifact(documents, embeddings, args.model, args.index_dir,
+                                extra_manifest, embed_options, args.keep_versions)
+    else:
+        version = build_artifact(documents, embeddings, args.model, args.index_dir,
+                                 extra_manifest, spec, embed_options, args.keep_versions)
+    print(f"CURRENT → {version}")
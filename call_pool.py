@@ -0,0 +1,133 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import METRICS, record
+
+MAX_WORKERS = int(os.environ.get("LLM_POOL_WORKERS", 8))    # OpenAI calls in flight, process-wide
+MAX_QUEUE = int(os.environ.get("LLM_POOL_QUEUE", 64))       # calls allowed to wait for a worker
+QUEUE_TIMEOUT = 30.0       # seconds a caller waits for a queue slot before giving up
+
+
+class PoolBusy(RuntimeError):
+    """The call queue stayed full for longer than the caller was willing to wait."""
+
+
+class CallPool:
+    """
+    Bounded executor shared by every Streamlit session in the process.
+
+    Calls are keyed (the query cache keys, plus the index version where results
+    depend on it); submitting a key that is already queued or running returns
+    the existing Future instead of starting a second identical call
+    (single-flight).  At most `max_workers`
+    calls run and `max_queue` wait; beyond that `submit` blocks for up to
+    `queue_timeout` seconds, then raises PoolBusy.  Jobs must not themselves
+    wait on the pool.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self.queue_timeout = queue_timeout
+        self.lock = threading.RLock()      # RLock: Future.cancel() runs the done callback inline
+        self.inflight = {}                 # key → {"future", "waiters", "started"}
+        self.waits = deque(maxlen=1000)    # seconds from submit to start, recent calls
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.counts = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0,
+                       "cancelled": 0}
+
+    def _coalesce(self, key):
+        entry = self.inflight.get(key)
+        if entry is None:
+            return None
+        entry["waiters"] += 1
+        self.counts["coalesced"] += 1
+        return entry["future"]
+
+    def submit(self, key, fn, *args):
+        """Future for `fn(*args)`, shared with any identical call already in flight."""
+        with self.lock:
+            future = self._coalesce(key)
+            if future is not None:
+                return future
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            with self.lock:
+                self.counts["rejected"] += 1
+            raise PoolBusy(f"{self.queued} calls already queued")
+        with self.lock:
+            # an identical call may have been submitted while we waited for a slot
+            future = self._coalesce(key)
+            if future is not None:
+                self.slots.release()
+                return future
+            entry = {"future": None, "waiters": 1, "started": None}
+            # copy_context so spans recorded by `fn` land in the submitter's trace
+            future = self.executor.submit(contextvars.copy_context().run, self._run,
+                                          entry, time.monotonic(), fn, args)
+            future.started = None
+            entry["future"] = future
+            self.inflight[key] = entry
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            self.counts["submitted"] += 1
+            future.add_done_callback(lambda f: self._done(key, entry))
+        return future
+
+    def _run(self, entry, submitted, fn, args):
+        start = time.monotonic()
+        with self.lock:
+            entry["started"] = entry["future"].started = start
+            self.queued -= 1
+            self.running += 1
+            self.waits.append(start - submitted)
+        record("pool_wait", start - submitted)
+        return fn(*args)
+
+    def _done(self, key, entry):
+        with self.lock:
+            if self.inflight.get(key) is entry:
+                del self.inflight[key]
+            if entry["started"] is None:
+                self.queued -= 1
+                self.counts["cancelled"] += 1
+            else:
+                self.running -= 1
+                self.counts["completed"] += 1
+        self.slots.release()
+
+    def call(self, key, fn, *args, timeout: float = None):
+        future = self.submit(key, fn, *args)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            self.release(key, future)
+            raise
+
+    def release(self, key, future) -> None:
+        """The caller no longer wants `future`; drop it if nobody else does and it has not started."""
+        with self.lock:
+            entry = self.inflight.get(key)
+            if entry is None or entry["future"] is not future:
+                return
+            entry["waiters"] -= 1
+            if entry["waiters"] <= 0:
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self.lock:
+            waits = sorted(self.waits)
+            pct = lambda q: round(waits[int(q * (len(waits) - 1))] * 1000, 1) if waits else 0.0
+            return {"queue_depth": self.queued, "running": self.running,
+                    "max_queue_depth": self.max_queued,
+                    "wait_p50_ms": pct(0.5), "wait_p95_ms": pct(0.95), **self.counts}
+
+
+POOL = CallPool()
+METRICS.register("pool", POOL.stats)
@@ -0,0 +1,209 @@
+import re
+
+import pandas as pd
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+CHUNK_CHARS = 1000         # ~½-1 page, as with the old splitter
+MIN_CHUNK_CHARS = 200      # shorter sections are merged into a neighbour
+HEADING_MAX_CHARS = 60
+MENU_ITEM_WORDS = 4        # average words per item of a bullet list that is a menu
+
+_CITED = re.compile(r"\s*\(Cited by (\d+)\)\s*$")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_HEADING = re.compile(r"^#{1,6}\s*(.*)$")
+_BULLET = re.compile(r"^\s*(?:[*+-]|\d+\.)\s+")
+
+
+def pack(lines, heading: str = "", max_chars: int = CHUNK_CHARS) -> list:
+    """
+    Greedily join consecutive `lines` into chunks of at most `max_chars`,
+    each starting with `heading` so a hit still says which section it is.
+    """
+    prefix = f"{heading}\n" if heading else ""
+    room = max_chars - len(prefix)
+    chunks, current, size = [], [], 0
+    for line in lines:
+        # a line longer than a chunk (a PDF paragraph with no line breaks)
+        pieces = RecursiveCharacterTextSplitter(chunk_size=room, chunk_overlap=100) \
+            .split_text(line) if len(line) > room else [line]
+        for piece in pieces:
+            if current and size + len(piece) + 1 > room:
+                chunks.append(prefix + "\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append(prefix + "\n".join(current))
+    return chunks
+
+
+def merge_small(chunks, min_chars: int = MIN_CHUNK_CHARS) -> list:
+    """Join (section, text) chunks shorter than `min_chars` onto their neighbour if both fit."""
+    out = []
+    for section, text in chunks:
+        if out and min(len(out[-1][1]), len(text)) < min_chars \
+                and len(out[-1][1]) + len(text) + 1 <= CHUNK_CHARS:
+            out[-1] = (out[-1][0] or section, f"{out[-1][1]}\n{text}")
+        else:
+            out.append((section, text))
+    return out
+
+
+# ------------------------------------------------------------------
+# 1.  Google Scholar: "title (Cited by n); title (Cited by n); ..."
+# ------------------------------------------------------------------
+def publications(text: str) -> list:
+    """(title, citations) entries, deduplicated, most-cited first."""
+    entries, pending, seen = [], "", set()
+    for piece in text.split("; "):
+        # a title may itself contain "; ", so an entry ends at its citation count
+        pending = f"{pending}; {piece}" if pending else piece
+        m = _CITED.search(pending)
+        if m is None:
+            continue
+        title = pending[:m.start()].strip()
+        pending = ""
+        if title and title.lower() not in seen:
+            seen.add(title.lower())
+            entries.append((title, int(m.group(1))))
+    if pending.strip() and pending.strip().lower() not in seen:
+        entries.append((pending.strip(), 0))
+    return sorted(entries, key=lambda e: -e[1])
+
+
+def chunk_scholar(text: str) -> list:
+    """
+    Publication titles grouped by citation count: each chunk is a run of
+    titles with similar counts, headed by that range instead of repeating
+    "(Cited by n)" on every line.
+    """
+    chunks, group, size = [], [], 0
+
+    def flush():
+        hi, lo = group[0][1], group[-1][1]
+        heading = f"Publications cited {lo}-{hi} times:" if lo != hi else \
+            f"Publications cited {hi} times:"
+        chunks.append(("Publications", f"{heading}\n" + "\n".join(t for t, _ in group)))
+
+    for title, cited in publications(text):
+        if group and size + len(title) + 1 > CHUNK_CHARS - 40:
+            flush()
+            group, size = [], 0
+        group.append((title, cited))
+        size += len(title) + 1
+    if group:
+        flush()
+    return chunks
+
+
+# ------------------------------------------------------------------
+# 2.  CVs: PDF text, split at section headings
+# ------------------------------------------------------------------
+def is_heading(line: str) -> bool:
+    """EDUCATION, HONORS & AWARDS, "Teaching Experience:" and the like."""
+    s = line.strip()
+    if not 4 <= len(s) <= HEADING_MAX_CHARS or any(c.isdigit() for c in s):
+        return False
+    letters = [c for c in s if c.isalpha()]
+    if len(letters) < 4 or not s[0].isalpha():
+        return False
+    if s.isupper():
+        return len(letters) >= 6 or " " in s
+    return s.endswith(":") and s[0].isupper() and len(s.split()) <= 6
+
+
+def sections(text: str) -> list:
+    """[(heading, [lines])] in order; text before the first heading has heading ""."""
+    out = [("", [])]
+    for line in text.splitlines():
+        s = " ".join(line.split())
+        if not s:
+            continue
+        if is_heading(s):
+            out.append((s.rstrip(" :"), []))
+        else:
+            out[-1][1].append(s)
+    return [(h, lines) for h, lines in out if lines]
+
+
+def chunk_cv(text: str) -> list:
+    return merge_small([(heading, chunk) for heading, lines in sections(text)
+                        for chunk in pack(lines, heading)])
+
+
+# ------------------------------------------------------------------
+# 3.  Web pages: markdown from the crawler, split at its blocks
+# ------------------------------------------------------------------
+def is_menu(lines) -> bool:
+    """Nothing but bullet items, a few words each on average: navigation."""
+    items = [_BULLET.sub("", l) for l in lines if _BULLET.match(l)]
+    return len(items) == len(lines) and \
+        sum(len(i.split()) for i in items) <= MENU_ITEM_WORDS * len(items)
+
+
+def web_blocks(text: str) -> list:
+    """[(heading, [blocks])]: blank-line separated blocks under their markdown heading."""
+    out = [("", [])]
+    for block in re.split(r"\n\s*\n", text):
+        # keep link text, drop the URLs (and images, which are only URLs)
+        block = _LINK.sub(r"\1", _IMAGE.sub("", block)).strip()
+        lines = [" ".join(l.split()) for l in block.splitlines() if l.strip()]
+        if not lines:
+            continue
+        m = _MD_HEADING.match(lines[0])
+        if m and len(m.group(1)) <= HEADING_MAX_CHARS:
+            if m.group(1):
+                out.append((m.group(1), []))
+            lines = lines[1:]
+        elif m:
+            lines[0] = m.group(1)      # a whole paragraph marked up as a heading
+        if is_menu(lines):
+            continue
+        # rejoin wrapped paragraph lines; list items stay one per line
+        out[-1][1].append("".join(("\n" if _BULLET.match(l) else " ") + l
+                                  for l in lines).strip())
+    return [(h, blocks) for h, blocks in out if blocks]
+
+
+def chunk_web(text: str) -> list:
+    return merge_small([(heading, chunk) for heading, blocks in web_blocks(text)
+                        for chunk in pack(blocks, heading)])
+
+
+def is_publication_list(paragraph: str) -> bool:
+    pieces = paragraph.split("; ")
+    return len(pieces) >= 3 and sum(bool(_CITED.search(p)) for p in pieces) >= len(pieces) // 2
+
+
+def chunk_text(text: str) -> list:
+    """
+    A combined.json text, whose sources are already concatenated: its
+    Scholar publication list (one paragraph) is chunked as such, the rest
+    as a CV.
+    """
+    paragraphs = re.split(r"\n\s*\n", text)
+    scholar = [p for p in paragraphs if is_publication_list(p)]
+    rest = "\n\n".join(p for p in paragraphs if not is_publication_list(p))
+    return [c for p in scholar for c in chunk_scholar(p)] + chunk_cv(rest)
+
+
+CHUNKERS = {"scholar": chunk_scholar, "cv": chunk_cv, "web": chunk_web, "text": chunk_text}
+
+
+def chunk_source(source: str, text: str) -> list:
+    """[(section, chunk text)] for one professor's text from `source`."""
+    return CHUNKERS[source](text)
+
+
+def chunk_sources(texts: dict) -> pd.DataFrame:
+    """
+    Chunk {source: {key: text}} in one pass per source.  Returns a frame with
+    key, source, section and text columns, in source then key order, ready
+    to be joined to the professor metadata.
+    """
+    rows = [(key, source, section, chunk)
+            for source, by_key in texts.items()
+            for key, text in by_key.items() if text
+            for section, chunk in chunk_source(source, text)]
+    return pd.DataFrame(rows, columns=["key", "source", "section", "text"])
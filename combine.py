@@ -1,66 +1,69 @@
-import json
+import argparse
+from collections import Counter
 
-def key_prefix(full_name: str) -> str:
-    """Return the first two whitespace-separated tokens (≈ first + last)."""
-    return " ".join(full_name.split()[:2])
+from corpus_store import CorpusStore, iter_json_items
+from name_resolution import NameResolver
 
-# ------------------------------------------------------------------
-# 1.  Load the three source files
-# ------------------------------------------------------------------
-with open("all_scholars.json", encoding="utf-8") as f:
-    scholars = json.load(f)        # { full name → publications-text }
-
-with open("CV.json", encoding="utf-8") as f:
-    cvs = json.load(f)             # { full name → cv-text }
-
-with open("web_data.json", encoding="utf-8") as f:
-    web_pages = json.load(f)       # { full name → scraped-web-text }
+NEAR_MISS = 0.8            # new people this similar to someone are listed for review
 
 # ------------------------------------------------------------------
-# 2.  Start the merged dict with everything from all_scholars.json
+# 1.  The three source files, merged in this order.  Names are resolved
+#     against Data.csv; people it lacks get their own id, shared by the
+#     later sources.
 # ------------------------------------------------------------------
-merged = {name: pubs for name, pubs in scholars.items()}
-
-# keep a lookup from “first two words” → canonical full name in `merged`
-def build_prefix_map(d):
-    return {key_prefix(n): n for n in d}
-
-prefix_to_name = build_prefix_map(merged)
+SOURCE_FILES = [
+    ("scholar", "all_scholars.json"),   # { full name → publications-text }
+    ("cv",      "CV.json"),             # { full name → cv-text }
+    ("web",     "web_data.json"),       # { full name → scraped-web-text }
+]
 
 # ------------------------------------------------------------------
-# 3.  Helper to merge any *additional* source (CVs, web pages, …)
+# 2.  Stream each source into the corpus store
 # ------------------------------------------------------------------
-def merge_source(source_dict: dict[str, str], label: str) -> None:
+def merge_source(store: CorpusStore, resolver: NameResolver, source: str, path: str) -> None:
     """
-    Append `source_dict` text into the correct entry in `merged`
-    (matched by first+last name).  If the person is new, just add them.
-    `label` is only for console feedback.
+    Upsert every entry of `path` into `store` under its professor id (see
+    name_resolution.py).  If the person is new, they get their own entry.
+    Rows of this source that no longer appear are removed, and how each
+    name resolved is recorded in the store.
     """
-    global prefix_to_name
+    texts, resolutions = {}, []
+    methods = Counter()
+    for src_name, src_txt in iter_json_items(path):
+        match = resolver.resolve_or_add(src_name, src_txt)
+        methods[match.method] += 1
+        resolutions.append((src_name, match.professor_id, match.confidence, match.method))
+        pid = match.professor_id
+        texts[pid] = f"{texts.get(pid, '')}\n\n{src_txt}".strip()
+        if match.method in ("fuzzy", "email", "ambiguous") or match.confidence >= NEAR_MISS \
+                and match.method == "new":
+            print(f"  ? {src_name!r} → {resolver.display[pid]!r} "
+                  f"({match.method}, {match.confidence:.2f})")
 
-    for src_name, src_txt in source_dict.items():
-        p = key_prefix(src_name)
+    changed = store.upsert_many(source, texts.items())
+    removed = store.delete_missing(source, texts)
+    store.record_names(source, resolutions)
+    print(f"✓ merged {sum(methods.values()):>4} entries from {path} ({changed} changed, "
+          f"{removed} removed; " + ", ".join(f"{n} {m}" for m, n in methods.most_common()) + ")")
 
-        if p in prefix_to_name:
-            canon = prefix_to_name[p]
-            merged[canon] = f"{merged[canon]}\n\n{src_txt}".strip()
-        else:
-            # brand-new person → add & update lookup table
-            merged[src_name] = src_txt.strip()
-            prefix_to_name[p] = src_name
 
-    print(f"✓ merged {len(source_dict):>4} entries from {label}")
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Merge scraped sources into the corpus store")
+    ap.add_argument("--db", default="corpus.sqlite")
+    ap.add_argument("--csv", default="Data.csv", help="professors (names and emails) to resolve to")
+    ap.add_argument("--export", default="combined.json",
+                    help="also write the {professor id: text} JSON (empty string to skip)")
+    args = ap.parse_args()
 
-# ------------------------------------------------------------------
-# 4.  Merge CVs, then web data
-# ------------------------------------------------------------------
-merge_source(cvs,       "CV.json")
-merge_source(web_pages, "web_data.json")
-
-# ------------------------------------------------------------------
-# 5.  Write out the combined result
-# ------------------------------------------------------------------
-with open("combined.json", "w", encoding="utf-8") as f:
-    json.dump(merged, f, ensure_ascii=False, indent=4)
+    store = CorpusStore(args.db)
+    resolver = NameResolver.from_csv(args.csv)
+    for source, path in SOURCE_FILES:
+        merge_source(store, resolver, source, path)
 
-print(f"Final combined.json contains {len(merged)} people.")
+    # ------------------------------------------------------------------
+    # 3.  Write out the combined result
+    # ------------------------------------------------------------------
+    if args.export:
+        n = store.export_json(args.export)
+        print(f"Final {args.export} contains {n} people.")
+    store.close()
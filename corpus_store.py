@@ -0,0 +1,155 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+CORPUS_PATH = "corpus.sqlite"
+
+# order the sources are concatenated in when a professor's full text is needed
+SOURCES = ("scholar", "cv", "web")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def iter_json_items(path):
+    """
+    Yield (key, value) from a top-level JSON object, streamed with ijson
+    (in requirements.txt); without it the whole file is loaded at once.
+    """
+    try:
+        import ijson
+    except ImportError:
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f).items()
+        return
+    with open(path, "rb") as f:
+        yield from ijson.kvitems(f, "")
+
+
+def join_sources(parts: dict) -> str:
+    """Concatenate one professor's {source: text} in SOURCES order."""
+    return "\n\n".join(parts[s] for s in SOURCES if parts.get(s)).strip()
+
+
+class CorpusStore:
+    """
+    One row per (professor, source) with a content hash and a change sequence
+    number, so readers can pull a single professor or just the rows changed
+    since their last build instead of parsing the whole corpus.  `professor`
+    is the professor id from name_resolution; the `names` table records which
+    source name resolved to it, how and with what confidence.
+    """
+
+    def __init__(self, path: str = CORPUS_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                professor TEXT NOT NULL,
+                source TEXT NOT NULL,
+                text TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (professor, source));
+            CREATE INDEX IF NOT EXISTS documents_seq ON documents (seq);
+            CREATE TABLE IF NOT EXISTS deletions (
+                professor TEXT NOT NULL, source TEXT NOT NULL, seq INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS names (
+                source TEXT NOT NULL,
+                name TEXT NOT NULL,
+                professor TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                method TEXT NOT NULL,
+                PRIMARY KEY (source, name));
+        """)
+        self.db.commit()
+
+    def current_seq(self) -> int:
+        row = self.db.execute("SELECT MAX(s) FROM (SELECT MAX(seq) s FROM documents "
+                              "UNION ALL SELECT MAX(seq) FROM deletions)").fetchone()
+        return row[0] or 0
+
+    # -- writes --------------------------------------------------------------
+    def upsert_many(self, source: str, rows) -> int:
+        """Insert or replace `(professor, text)` rows of one source; returns how many changed."""
+        seq = self.current_seq() + 1
+        now = time.time()
+        changed = 0
+        for professor, text in rows:
+            h = content_hash(text)
+            old = self.db.execute("SELECT content_hash FROM documents WHERE professor = ? "
+                                  "AND source = ?", (professor, source)).fetchone()
+            if old is not None and old[0] == h:
+                continue
+            self.db.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                            (professor, source, text, h, seq, now))
+            changed += 1
+        self.db.commit()
+        return changed
+
+    def delete_missing(self, source: str, keep) -> int:
+        """Drop rows of `source` whose professor is not in `keep`."""
+        keep = set(keep)
+        seq = self.current_seq() + 1
+        gone = [p for (p,) in self.db.execute(
+            "SELECT professor FROM documents WHERE source = ?", (source,)) if p not in keep]
+        for p in gone:
+            self.db.execute("DELETE FROM documents WHERE professor = ? AND source = ?", (p, source))
+            self.db.execute("INSERT INTO deletions VALUES (?, ?, ?)", (p, source, seq))
+        self.db.commit()
+        return len(gone)
+
+    def record_names(self, source: str, rows) -> None:
+        """Replace the `(name, professor, confidence, method)` resolutions of one source."""
+        self.db.execute("DELETE FROM names WHERE source = ?", (source,))
+        self.db.executemany("INSERT OR REPLACE INTO names VALUES (?, ?, ?, ?, ?)",
+                            [(source, *row) for row in rows])
+        self.db.commit()
+
+    # -- reads ---------------------------------------------------------------
+    def professors(self) -> list:
+        return [p for (p,) in self.db.execute(
+            "SELECT DISTINCT professor FROM documents ORDER BY professor")]
+
+    def professor(self, professor_id: str) -> dict:
+        """{source: text} for one professor."""
+        return dict(self.db.execute(
+            "SELECT source, text FROM documents WHERE professor = ?", (professor_id,)))
+
+    def source_texts(self, source: str) -> dict:
+        """{professor: text} for one source."""
+        return dict(self.db.execute(
+            "SELECT professor, text FROM documents WHERE source = ?", (source,)))
+
+    def names(self, min_confidence: float = 1.0) -> list:
+        """(source, name, professor, confidence, method) resolved below `min_confidence`."""
+        return self.db.execute(
+            "SELECT source, name, professor, confidence, method FROM names "
+            "WHERE confidence < ? OR method IN ('new', 'ambiguous') "
+            "ORDER BY confidence", (min_confidence,)).fetchall()
+
+    def full_text(self, professor_id: str) -> str:
+        return join_sources(self.professor(professor_id))
+
+    def iter_full_texts(self):
+        """Yield (professor id, concatenated text) one professor at a time."""
+        for professor_id in self.professors():
+            yield professor_id, self.full_text(professor_id)
+
+    def changed_since(self, seq: int):
+        """Professors with any row added, changed or deleted after `seq`."""
+        return sorted({p for (p,) in self.db.execute(
+            "SELECT professor FROM documents WHERE seq > ? "
+            "UNION SELECT professor FROM deletions WHERE seq > ?", (seq, seq))})
+
+    def export_json(self, path: str) -> int:
+        """Write the combined.json-style {professor id: text} dict."""
+        merged = dict(self.iter_full_texts())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False, indent=4)
+        return len(merged)
+
+    def close(self) -> None:
+        self.db.close()
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import aiohttp
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/124.0 Safari/537.36")
+
+# same policy as the old urllib3 Retry: 3 retries, 1s/2s/4s backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allow `rate` requests per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    text: str = ""
+    error: str = ""
+    elapsed: float = 0.0     # seconds, including retries and rate-limit waits
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class Crawler:
+    """
+    Concurrent GET crawler: one pooled keep-alive session, at most
+    `concurrency` requests in flight overall and `per_host_rate` req/s per host.
+
+    With a `cache` (fetch_cache.FetchCache) pages are revalidated with
+    If-None-Match / If-Modified-Since, and URLs in the negative cache are
+    skipped without a request.
+    """
+
+    def __init__(self, concurrency: int = 16, per_host_rate: float = 2.0,
+                 per_host_burst: int = 2, timeout: float = 10, retries: int = 3,
+                 backoff_factor: float = 1.0, headers: dict = None, cache=None):
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.cache = cache
+        self.results = []
+        self.wall_time = 0.0
+
+    async def _fetch(self, session, sem, buckets, url) -> FetchResult:
+        result = FetchResult(url)
+        if self.cache is not None:
+            skipped = self.cache.skip_reason(url)
+            if skipped:
+                result.error = f"skipped (negative cache): {skipped}"
+                return result
+        conditional = self.cache.conditional_headers(url) if self.cache is not None else {}
+        start = time.monotonic()
+        bucket = buckets[urlsplit(url).netloc.lower()]
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            retry, retry_after = False, None
+            await bucket.acquire()
+            async with sem:
+                try:
+                    async with session.get(url, headers=conditional) as resp:
+                        result.status = resp.status
+                        if resp.status == 304 and conditional:
+                            result.text = self.cache.get(url)[0]
+                            result.error = ""
+                            self.cache.touch(url, resp.headers.get("ETag"),
+                                             resp.headers.get("Last-Modified"))
+                        elif resp.status >= 400:
+                            kind = "Client" if resp.status < 500 else "Server"
+                            result.error = f"{resp.status} {kind} Error: {resp.reason} for url: {url}"
+                            retry = resp.status in RETRY_STATUSES
+                            retry_after = resp.headers.get("Retry-After")
+                        else:
+                            result.text = await resp.text(errors="replace")
+                            result.error = ""
+                            if self.cache is not None:
+                                self.cache.store(url, result.text, resp.headers.get("ETag"),
+                                                 resp.headers.get("Last-Modified"))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result.error = f"{type(e).__name__}: {e}"
+                    retry = True
+            if not retry or attempt == self.retries:
+                break
+            delay = self.backoff_factor * (2 ** attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+        if result.error and self.cache is not None:
+            self.cache.record_failure(url, result.error)
+        result.elapsed = time.monotonic() - start
+        return result
+
+    async def crawl_async(self, urls) -> dict:
+        urls = list(dict.fromkeys(urls))
+        sem = asyncio.Semaphore(self.concurrency)
+        buckets = defaultdict(lambda: TokenBucket(self.per_host_rate, self.per_host_burst))
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=4,
+                                         keepalive_timeout=30, ttl_dns_cache=300)
+        start = time.monotonic()
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                         headers=self.headers) as session:
+            self.results = await asyncio.gather(
+                *(self._fetch(session, sem, buckets, u) for u in urls))
+        self.wall_time = time.monotonic() - start
+        for r in self.results:
+            if r.error and r.attempts:
+                logging.warning(f"[FETCH-fail] {r.url} → {r.error}")
+        return {r.url: r for r in self.results}
+
+    def crawl(self, urls) -> dict:
+        """Fetch every URL; returns {url: FetchResult}."""
+        return asyncio.run(self.crawl_async(urls))
+
+    def report(self) -> str:
+        """Throughput / latency summary of the last crawl."""
+        skipped = sum(r.attempts == 0 for r in self.results)
+        fetched = [r for r in self.results if r.attempts]
+        n = len(fetched)
+        if not n:
+            return f"No URLs crawled ({skipped} skipped by the negative cache)."
+        lat = sorted(r.elapsed for r in fetched)
+        pct = lambda p: lat[min(n - 1, int(p * n))]
+        ok = sum(r.ok for r in fetched)
+        statuses = Counter(r.status for r in fetched)
+        hosts = len({urlsplit(r.url).netloc for r in fetched})
+        return "\n".join([
+            f"Crawled {n} URLs on {hosts} hosts in {self.wall_time:.1f}s "
+            f"({n / self.wall_time if self.wall_time else 0:.1f} URLs/s)",
+            f"  ok {ok} ({statuses[304]} unchanged), failed {n - ok}, "
+            f"retries {sum(r.attempts - 1 for r in fetched)}, skipped {skipped}",
+            f"  latency p50 {pct(0.5):.2f}s  p95 {pct(0.95):.2f}s  max {lat[-1]:.2f}s",
+            "  status " + ", ".join(f"{s or 'error'}: {c}" for s, c in sorted(statuses.items())),
+        ])
@@ -1,6 +1,10 @@
-import pandas as pd
-import os
+import argparse
+import hashlib
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import PyPDF2
 
 
@@ -41,5 +45,184 @@ def read_pdfs_and_save(folder_path, output_json='pdf_texts.json'):
     print(f"Extracted PDF texts have been saved to {output_json}")
     return all_text_data
 
-cvs = "C:\Louwyn\Python\WASHU User Search\CVs"
-CV = read_pdfs_and_save(cvs)
\ No newline at end of file
+
+# ------------------------------------------------------------------
+# Incremental, parallel extraction
+#   pdf_texts.jsonl     one {"file", "text"} line per extracted PDF
+#   pdf_manifest.json   size / mtime / sha256 of every PDF extracted OK
+#   pdf_extract_log.jsonl   per-file timing and failures, one line per attempt
+# ------------------------------------------------------------------
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def extract_pdf(pdf_path):
+    """Extract one PDF; runs in a worker process, so it never raises."""
+    start = time.perf_counter()
+    record = {"file": os.path.basename(pdf_path), "text": "", "pages": 0, "error": ""}
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            pages = [page.extract_text() for page in pdf_reader.pages]
+        record["pages"] = len(pages)
+        record["text"] = "\n".join(p for p in pages if p)
+    except Exception as e:           # e.g. "No /Root object! - Is this really a PDF?"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def changed_pdfs(folder_path, manifest):
+    """
+    PDFs in `folder_path` whose content differs from `manifest`.
+    Size + mtime match → unchanged without reading the file; otherwise the
+    hash decides (a touched-but-identical file just gets its mtime refreshed).
+    """
+    todo = []
+    for file_name in sorted(os.listdir(folder_path)):
+        if not file_name.lower().endswith('.pdf'):
+            continue
+        path = os.path.join(folder_path, file_name)
+        st = os.stat(path)
+        seen = manifest.get(file_name)
+        if seen and seen["size"] == st.st_size and seen["mtime"] == st.st_mtime:
+            continue
+        digest = file_sha256(path)
+        if seen and seen["sha256"] == digest:
+            seen["mtime"] = st.st_mtime
+            continue
+        todo.append((path, {"size": st.st_size, "mtime": st.st_mtime, "sha256": digest}))
+    return todo
+
+
+def save_manifest(manifest, manifest_path):
+    tmp = manifest_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path)
+
+
+def drop_torn_line(path):
+    """Cut an unterminated last line (an interrupted append) off `path`, so appends start clean."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        # scan back to the last complete line
+        pos = size
+        while pos > 0:
+            step = min(1 << 16, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            nl = block.rfind(b'\n')
+            if nl >= 0:
+                f.truncate(pos - step + nl + 1)
+                return
+            pos -= step
+        f.truncate(0)
+
+
+def drop_deleted(folder_path, manifest, output_jsonl):
+    """
+    Forget PDFs that are no longer in `folder_path`: remove them from
+    `manifest` and rewrite `output_jsonl` without their lines (keeping one
+    line, the latest, per remaining file).
+    """
+    present = {f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')}
+    deleted = [f for f in manifest if f not in present]
+    for f in deleted:
+        del manifest[f]
+    if deleted and os.path.exists(output_jsonl):
+        texts = {f: t for f, t in load_texts(output_jsonl).items() if f in present}
+        tmp = output_jsonl + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as out:
+            for f, text in texts.items():
+                out.write(json.dumps({"file": f, "text": text}, ensure_ascii=False) + "\n")
+        os.replace(tmp, output_jsonl)
+    return deleted
+
+
+def extract_folder(folder_path, output_jsonl='pdf_texts.jsonl',
+                   manifest_path='pdf_manifest.json', log_path='pdf_extract_log.jsonl',
+                   workers=None):
+    """
+    Extract new or changed PDFs in parallel, streaming each result to
+    `output_jsonl`.  The manifest is saved after every PDF, so an
+    interrupted run resumes with the PDFs it had not finished.
+    """
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    drop_torn_line(output_jsonl)
+    deleted = drop_deleted(folder_path, manifest, output_jsonl)
+    if deleted:
+        print(f"{len(deleted)} PDFs deleted since the last run")
+    todo = changed_pdfs(folder_path, manifest)
+    save_manifest(manifest, manifest_path)
+    print(f"{len(todo)} PDFs new or changed, {len(manifest)} in manifest")
+
+    ok = failed = 0
+    start = time.perf_counter()
+    with open(output_jsonl, 'a', encoding='utf-8') as out, \
+            open(log_path, 'a', encoding='utf-8') as log, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(extract_pdf, path): (path, sig) for path, sig in todo}
+        for fut in as_completed(futures):
+            path, sig = futures[fut]
+            record = fut.result()
+            log.write(json.dumps({k: record[k] for k in ("file", "pages", "seconds", "error")},
+                                 ensure_ascii=False) + "\n")
+            if record["error"]:
+                failed += 1
+                print(f"✗ {record['file']}: {record['error']}")
+                continue
+            out.write(json.dumps({"file": record["file"], "text": record["text"]},
+                                 ensure_ascii=False) + "\n")
+            out.flush()
+            # the text line first: a crash between the two re-extracts this PDF,
+            # and load_texts keeps the later of its two lines
+            manifest[record["file"]] = sig
+            save_manifest(manifest, manifest_path)
+            ok += 1
+
+    print(f"Extracted {ok} PDFs ({failed} failed) in {time.perf_counter() - start:.1f}s "
+          f"→ {output_jsonl}")
+    return ok, failed
+
+
+def load_texts(output_jsonl='pdf_texts.jsonl'):
+    """{file name: text}, keeping the latest line for files extracted more than once."""
+    texts = {}
+    with open(output_jsonl, encoding='utf-8') as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue          # torn last line from an interrupted run
+            texts[rec["file"]] = rec["text"]
+    return texts
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Extract CV PDFs to JSONL")
+    ap.add_argument("folder", nargs="?", default=r"C:\Louwyn\Python\WASHU User Search\CVs")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--json", help="also write a {file: text} JSON, e.g. CV.json")
+    args = ap.parse_args()
+
+    extract_folder(args.folder, workers=args.workers)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(load_texts(), json_file, ensure_ascii=False, indent=4)
+        print(f"Extracted PDF texts have been saved to {args.json}")
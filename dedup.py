@@ -0,0 +1,114 @@
+import hashlib
+import re
+from collections import Counter
+
+import numpy as np
+
+from tokens import estimate_tokens
+
+NUM_PERM = 128
+BANDS = 16                 # 16 bands × 8 rows: pairs above ~0.7 Jaccard become candidates
+SHINGLE_WORDS = 5
+DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard at or above which a chunk is dropped
+BOILERPLATE_MIN_DOCS = 5   # a line on this many professors' pages is site chrome
+BOILERPLATE_MAX_CHARS = 120
+
+_PRIME = 4294967311        # smallest prime above 2**32
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 2**31, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2**31, NUM_PERM).astype(np.uint64)
+_WORD = re.compile(r"\w+")
+
+
+# ------------------------------------------------------------------
+# 1.  Boilerplate lines: navigation and menus repeated across pages
+# ------------------------------------------------------------------
+def _line_key(line: str) -> str:
+    return " ".join(line.split()).lower()
+
+
+def boilerplate_lines(texts, min_docs: int = BOILERPLATE_MIN_DOCS) -> set:
+    """Short lines that occur in at least `min_docs` of `texts`."""
+    counts = Counter()
+    for text in texts:
+        counts.update({k for k in map(_line_key, text.splitlines())
+                       if k and len(k) <= BOILERPLATE_MAX_CHARS})
+    return {k for k, n in counts.items() if n >= min_docs}
+
+
+def strip_boilerplate(texts: dict, min_docs: int = BOILERPLATE_MIN_DOCS, exempt=None):
+    """
+    Drop cross-page boilerplate lines, and short lines repeated within one
+    text (menus rendered twice), from every value of `texts`.  Lines for
+    which `exempt(line)` is true are always kept.
+    Returns (cleaned texts, lines removed, estimated tokens removed).
+    """
+    common = boilerplate_lines(texts.values(), min_docs)
+    cleaned, removed, tokens = {}, 0, 0
+    for name, text in texts.items():
+        seen, keep = set(), []
+        for line in text.splitlines():
+            k = _line_key(line)
+            if k and (k in common or (k in seen and len(k) <= BOILERPLATE_MAX_CHARS)) \
+                    and not (exempt and exempt(line)):
+                removed += 1
+                tokens += estimate_tokens(line)
+                continue
+            seen.add(k)
+            keep.append(line)
+        cleaned[name] = re.sub(r"\n{3,}", "\n\n", "\n".join(keep)).strip()
+    return cleaned, removed, tokens
+
+
+# ------------------------------------------------------------------
+# 2.  MinHash / LSH near-duplicate chunks
+# ------------------------------------------------------------------
+def minhash(text: str) -> np.ndarray:
+    """NUM_PERM-long MinHash signature over word shingles."""
+    words = _WORD.findall(text.lower())
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS])
+                for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+                       for s in shingles], dtype=np.uint64)
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+def near_duplicates(texts, threshold: float = DUPLICATE_THRESHOLD) -> list:
+    """
+    Positions of texts that near-duplicate an earlier one.  LSH banding finds
+    candidate pairs; a candidate is a duplicate if the signatures agree on at
+    least `threshold` of their positions (estimated Jaccard similarity).
+    """
+    rows = NUM_PERM // BANDS
+    buckets = {}
+    kept_sigs, dupes = [], []
+    for pos, text in enumerate(texts):
+        sig = minhash(text)
+        keys = [(b, sig[b * rows:(b + 1) * rows].tobytes()) for b in range(BANDS)]
+        candidates = {c for key in keys for c in buckets.get(key, ())}
+        if any(np.mean(kept_sigs[c] == sig) >= threshold for c in candidates):
+            dupes.append(pos)
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(len(kept_sigs))
+        kept_sigs.append(sig)
+    return dupes
+
+
+def drop_near_duplicates(documents, threshold: float = DUPLICATE_THRESHOLD):
+    """
+    Remove chunks that near-duplicate an earlier chunk of the same professor
+    (the same publication list from CV and Scholar, say).  Overlap between
+    different professors is kept: each must stay retrievable on their own.
+    Returns (kept documents, chunks dropped, estimated tokens dropped).
+    """
+    by_professor = {}
+    for pos, doc in enumerate(documents):
+        by_professor.setdefault(doc.metadata["professor_id"], []).append(pos)
+    dropped = set()
+    for positions in by_professor.values():
+        dupes = near_duplicates([documents[p].page_content for p in positions], threshold)
+        dropped.update(positions[i] for i in dupes)
+    tokens = sum(estimate_tokens(documents[p].page_content) for p in dropped)
+    kept = [doc for pos, doc in enumerate(documents) if pos not in dropped]
+    return kept, len(dropped), tokens
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tokens import estimate_tokens
+
+RPM = 3000                 # requests per minute  (text-embedding-3-large, usage tier 1)
+TPM = 1_000_000            # tokens per minute
+CONCURRENCY = 4            # requests in flight
+BATCH_TOKENS = 100_000     # per request; the API caps a request at 300k
+BATCH_SIZE = 512           # inputs per request; the API caps it at 2048
+RETRIES = 6
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateBudget:
+    """
+    Requests-per-minute and tokens-per-minute token buckets shared by every
+    worker thread.  `acquire` blocks until both have room for one request
+    of `tokens` tokens.
+    """
+
+    def __init__(self, rpm: float = RPM, tpm: float = TPM):
+        self.capacity = [float(rpm), float(tpm)]
+        self.level = list(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens; returns the seconds spent waiting."""
+        need = [1.0, min(float(tokens), self.capacity[1])]
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                for i, cap in enumerate(self.capacity):
+                    self.level[i] = min(cap, self.level[i] + (now - self.updated) * cap / 60)
+                self.updated = now
+                if all(l >= n for l, n in zip(self.level, need)):
+                    self.level = [l - n for l, n in zip(self.level, need)]
+                    return waited
+                delay = max((n - l) * 60 / cap
+                            for l, n, cap in zip(self.level, need, self.capacity))
+            time.sleep(delay)
+            waited += delay
+
+
+def token_batches(texts, max_tokens: int = BATCH_TOKENS, max_size: int = BATCH_SIZE):
+    """Split positions of `texts` into consecutive batches under both limits."""
+    batch, batch_tokens = [], 0
+    for pos, text in enumerate(texts):
+        n = estimate_tokens(text)
+        if batch and (batch_tokens + n > max_tokens or len(batch) >= max_size):
+            yield batch, batch_tokens
+            batch, batch_tokens = [], 0
+        batch.append(pos)
+        batch_tokens += n
+    if batch:
+        yield batch, batch_tokens
+
+
+def retry_delay(error, attempt: int, backoff: float):
+    """Seconds to wait before retrying `error`, or None if it is not worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status is None and type(error).__name__ not in ("APIConnectionError", "APITimeoutError") \
+            and not isinstance(error, (ConnectionError, TimeoutError)):
+        return None
+    if status is not None and status not in RETRY_STATUSES:
+        return None
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return backoff * 2 ** attempt
+
+
+class EmbeddingPipeline:
+    """
+    Embed texts in token-bounded batches, several requests at a time, within
+    an RPM / TPM budget.  Rate-limit and server errors back off exponentially
+    (honouring Retry-After).  Each finished batch is appended to the
+    EmbeddingCache straight away, so a crashed build resumes where it stopped.
+    """
+
+    def __init__(self, underlying, cache, rpm: float = RPM, tpm: float = TPM,
+                 concurrency: int = CONCURRENCY, batch_tokens: int = BATCH_TOKENS,
+                 batch_size: int = BATCH_SIZE, retries: int = RETRIES, backoff: float = 1.0):
+        self.underlying = underlying
+        self.cache = cache
+        self.budget = RateBudget(rpm, tpm)
+        self.concurrency = concurrency
+        self.batch_tokens = batch_tokens
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = {"chunks": 0, "tokens": 0, "requests": 0, "retries": 0,
+                      "throttled_seconds": 0.0, "seconds": 0.0}
+        self.lock = threading.Lock()
+
+    def _embed_batch(self, texts, tokens: int):
+        for attempt in range(self.retries + 1):
+            waited = self.budget.acquire(tokens)
+            with self.lock:
+                self.stats["requests"] += 1
+                self.stats["throttled_seconds"] += waited
+            try:
+                return self.underlying.embed_documents(texts)
+            except Exception as e:
+                delay = retry_delay(e, attempt, self.backoff)
+                if delay is None or attempt == self.retries:
+                    raise
+                logging.warning(f"embedding batch of {len(texts)} failed ({e}); "
+                                f"retrying in {delay:.1f}s")
+                with self.lock:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+
+    def run(self, keys, texts) -> None:
+        """Embed `texts` and store them in the cache under `keys`."""
+        start = time.perf_counter()
+        batches = list(token_batches(texts, self.batch_tokens, self.batch_size))
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="embed") as pool:
+            futures = {pool.submit(self._embed_batch, [texts[p] for p in batch], tokens):
+                       (batch, tokens) for batch, tokens in batches}
+            try:
+                for future in as_completed(futures):
+                    batch, tokens = futures[future]
+                    # checkpoint: one append per finished batch, from this thread only
+                    self.cache.add([keys[p] for p in batch], future.result())
+                    self.stats["chunks"] += len(batch)
+                    self.stats["tokens"] += tokens
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                raise
+            finally:
+                self.stats["seconds"] += time.perf_counter() - start
+
+    def report(self) -> dict:
+        s = dict(self.stats)
+        seconds = s["seconds"]
+        s["seconds"] = round(seconds, 2)
+        s["throttled_seconds"] = round(s["throttled_seconds"], 2)
+        s["chunks_per_s"] = round(s["chunks"] / seconds, 1) if seconds else None
+        s["tokens_per_s"] = round(s["tokens"] / seconds) if seconds else None
+        return s
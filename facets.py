@@ -0,0 +1,103 @@
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+FACETS_FILE = "facets.json"
+FACETS = ("School:", "Department:")
+
+
+def facet_value(metadata: dict, facet: str):
+    value = metadata.get(facet)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return str(value).strip() or None
+
+
+def build_facets(documents) -> dict:
+    """{facet: {value: [professor ids]}} from the chunks' metadata."""
+    facets = {f: {} for f in FACETS}
+    for doc in documents:
+        pid = doc.metadata["professor_id"]
+        for f in FACETS:
+            value = facet_value(doc.metadata, f)
+            if value is not None:
+                ids = facets[f].setdefault(value, [])
+                if pid not in ids:
+                    ids.append(pid)
+    return facets
+
+
+def save_facets(facets: dict, path) -> None:
+    (Path(path) / FACETS_FILE).write_text(json.dumps(facets, ensure_ascii=False), "utf-8")
+
+
+def load_facets(path) -> dict:
+    """Facet values of a built version; {} for versions built before facets existed."""
+    file = Path(path) / FACETS_FILE
+    return json.loads(file.read_text("utf-8")) if file.exists() else {}
+
+
+def current_facets(index_dir: str = "vector_index") -> dict:
+    """
+    Facets of the CURRENT version, read without loading the index (or
+    importing FAISS), so the page can offer filters before the first search.
+    """
+    pointer = Path(index_dir) / "CURRENT"
+    if not pointer.exists():
+        return {}
+    return load_facets(Path(index_dir) / "versions" / pointer.read_text("utf-8").strip())
+
+
+@dataclass
+class Selection:
+    """The part of the index matching a filter, in each index's own ids."""
+    ids: set                  # professor ids
+    chunk_ids: set            # docstore ids, for BM25
+    rows: np.ndarray          # FAISS row numbers, for the chunk index
+    professors: np.ndarray    # ProfessorIndex positions, for the centroid index
+
+
+class FacetIndex:
+    """
+    Facet filters as id-set prefilters over a loaded version: a filter maps to
+    the matching professors, and from them to the exact ids each index
+    searches (docstore ids for BM25, FAISS rows, ProfessorIndex positions).
+    Selections are cached per filter.
+    """
+
+    def __init__(self, facets: dict, professors, vectorstore=None):
+        self.facets = facets
+        self.professors = professors
+        self.position = {pid: p for p, pid in enumerate(professors.ids)}
+        self.row = ({cid: row for row, cid in vectorstore.index_to_docstore_id.items()}
+                    if vectorstore is not None else {})
+        self._selections = {}
+
+    def options(self, facet: str) -> list:
+        return sorted(self.facets.get(facet, {}))
+
+    def select(self, filters: dict):
+        """
+        Selection for `filters` ({facet: [values]}; values OR within a facet,
+        facets AND together), or None when nothing is filtered.
+        """
+        key = tuple(sorted((f, tuple(sorted(v))) for f, v in (filters or {}).items() if v))
+        if not key:
+            return None
+        if key not in self._selections:
+            ids = None
+            for facet, values in key:
+                matched = {i for v in values for i in self.facets.get(facet, {}).get(v, [])}
+                ids = matched if ids is None else ids & matched
+            positions = sorted(self.position[i] for i in ids if i in self.position)
+            p = self.professors
+            chunk_ids = [cid for i in positions for cid in p.chunk_ids[p.offsets[i]:p.offsets[i + 1]]]
+            self._selections[key] = Selection(
+                ids, set(chunk_ids),
+                np.array([self.row[c] for c in chunk_ids if c in self.row], dtype=np.int64),
+                np.array(positions, dtype=np.int64),
+            )
+        return self._selections[key]
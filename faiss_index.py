@@ -0,0 +1,114 @@
+import math
+from dataclasses import asdict, dataclass
+
+import faiss
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+KINDS = ("flat", "ivf", "hnsw", "ivfpq")
+TRUNCATE_DIMS = (256, 512, 1024)
+
+
+@dataclass
+class IndexSpec:
+    """
+    How the chunk vectors are indexed.
+
+    kind      flat (exact), ivf, hnsw or ivfpq (product-quantized IVF)
+    dim       keep only the first `dim` components (Matryoshka truncation,
+              renormalized); None keeps the model's full width
+    float16   store vectors as float16 (ignored by ivfpq, which stores codes)
+    nprobe    IVF lists scanned per query
+    ef_search HNSW candidate list size per query
+    """
+    kind: str = "flat"
+    dim: int = None
+    float16: bool = False
+    nprobe: int = 8
+    ef_search: int = 64
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"unknown index type: {self.kind!r}")
+
+    @property
+    def label(self) -> str:
+        return (f"{self.kind}-{self.dim or 'full'}"
+                + ("-f16" if self.float16 and self.kind != "ivfpq" else ""))
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data) if data else cls()
+
+
+def truncate(vectors, dim: int = None) -> np.ndarray:
+    """First `dim` components of each row, renormalized to unit length."""
+    x = np.asarray(vectors, dtype=np.float32)
+    if dim is None or dim >= x.shape[-1]:
+        return x
+    x = x[..., :dim]
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+class TruncatedEmbeddings(Embeddings):
+    """Embed with `underlying`, then truncate to `dim` to match a truncated index."""
+
+    def __init__(self, underlying: Embeddings, dim: int):
+        self.underlying = underlying
+        self.dim = dim
+        self.model = getattr(underlying, "model", "")      # read by tracing.model_name
+
+    def embed_documents(self, texts):
+        return truncate(self.underlying.embed_documents(texts), self.dim).tolist()
+
+    def embed_query(self, text):
+        return truncate(self.underlying.embed_query(text), self.dim).tolist()
+
+
+def factory_string(spec: IndexSpec, n: int, d: int) -> str:
+    """faiss.index_factory description for `spec` over `n` vectors of width `d`."""
+    storage = "SQfp16" if spec.float16 else "Flat"
+    # IVF / PQ training wants ~39 points per centroid; shrink both for small corpora
+    nlist = max(1, min(round(4 * math.sqrt(n)), n // 39))
+    if spec.kind == "flat":
+        return storage
+    if spec.kind == "ivf":
+        return f"IVF{nlist},{storage}"
+    if spec.kind == "hnsw":
+        return "HNSW32" + ("" if storage == "Flat" else f",{storage}")
+    nbits = max(1, min(8, int(math.log2(max(2, n // 39)))))
+    m = next(m for m in (d // 16, d // 8, d // 4, d // 2, d) if m and d % m == 0)
+    return f"IVF{nlist},PQ{m}x{nbits}"
+
+
+def build_faiss_index(vectors, spec: IndexSpec):
+    """An empty, trained index for `spec`; the caller adds the vectors."""
+    x = np.ascontiguousarray(vectors, dtype=np.float32)
+    index = faiss.index_factory(x.shape[1], factory_string(spec, len(x), x.shape[1]))
+    if not index.is_trained:
+        index.train(x)
+    configure(index, spec)
+    return index
+
+
+def configure(index, spec: IndexSpec) -> None:
+    """Apply the query-time knobs (not stored in the index file)."""
+    params = faiss.ParameterSpace()
+    if spec.kind in ("ivf", "ivfpq"):
+        params.set_index_parameter(index, "nprobe", spec.nprobe)
+    elif spec.kind == "hnsw":
+        params.set_index_parameter(index, "efSearch", spec.ef_search)
+
+
+def search_params(index, rows):
+    """SearchParameters restricting `index` to `rows`, keeping its query-time knobs."""
+    sel = faiss.IDSelectorBatch(np.asarray(rows, dtype=np.int64))
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=sel, nprobe=ivf.nprobe)
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=sel)
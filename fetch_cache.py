@@ -0,0 +1,89 @@
+import sqlite3
+import time
+
+CACHE_PATH = ".fetch_cache.sqlite"
+
+NEGATIVE_TTL = 3600              # first failure skips the URL for an hour …
+NEGATIVE_TTL_MAX = 30 * 86400    # … doubling each time, up to 30 days
+
+
+class FetchCache:
+    """
+    On-disk record of what each URL returned last time.
+
+    `pages` keeps the body plus ETag / Last-Modified of the last good response
+    so re-crawls can send conditional requests.  `failures` is a negative
+    cache: a URL that keeps failing is skipped until its (exponentially
+    growing) TTL runs out.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY, body TEXT, etag TEXT, last_modified TEXT,
+                fetched_at REAL);
+            CREATE TABLE IF NOT EXISTS failures (
+                url TEXT PRIMARY KEY, error TEXT, failures INTEGER, retry_at REAL);
+        """)
+        self.db.commit()
+
+    # -- positive cache ----------------------------------------------------
+    def get(self, url: str):
+        """Return (body, etag, last_modified) or None."""
+        return self.db.execute("SELECT body, etag, last_modified FROM pages WHERE url = ?",
+                               (url,)).fetchone()
+
+    def fresh(self, url: str, max_age: float):
+        """Body stored less than `max_age` seconds ago, for sources that can't revalidate."""
+        row = self.db.execute("SELECT body FROM pages WHERE url = ? AND fetched_at > ?",
+                              (url, time.time() - max_age)).fetchone()
+        return row[0] if row else None
+
+    def conditional_headers(self, url: str) -> dict:
+        row = self.get(url)
+        if row is None:
+            return {}
+        headers = {}
+        if row[1]:
+            headers["If-None-Match"] = row[1]
+        if row[2]:
+            headers["If-Modified-Since"] = row[2]
+        return headers
+
+    def store(self, url: str, body: str, etag: str = None, last_modified: str = None) -> None:
+        self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                        (url, body, etag, last_modified, time.time()))
+        self.db.execute("DELETE FROM failures WHERE url = ?", (url,))
+        self.db.commit()
+
+    def touch(self, url: str, etag: str = None, last_modified: str = None) -> None:
+        """
+        Record a 304 Not Modified: the stored body is current as of now, so
+        `fresh` counts from here.  Validators sent with the 304 replace the old ones.
+        """
+        self.db.execute("UPDATE pages SET fetched_at = ?, etag = COALESCE(?, etag), "
+                        "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                        (time.time(), etag, last_modified, url))
+        self.db.execute("DELETE FROM failures WHERE url = ?", (url,))
+        self.db.commit()
+
+    # -- negative cache ----------------------------------------------------
+    def skip_reason(self, url: str):
+        """The last error if `url` is still inside its negative-cache TTL, else None."""
+        row = self.db.execute("SELECT error, retry_at FROM failures WHERE url = ?",
+                              (url,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def record_failure(self, url: str, error: str) -> None:
+        row = self.db.execute("SELECT failures FROM failures WHERE url = ?", (url,)).fetchone()
+        failures = (row[0] if row else 0) + 1
+        ttl = min(NEGATIVE_TTL * 2 ** (failures - 1), NEGATIVE_TTL_MAX)
+        self.db.execute("INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?)",
+                        (url, error, failures, time.time() + ttl))
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
@@ -1,76 +1,237 @@
-import time
+import argparse
 import csv
 import json
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 
-def load_all_publications(driver, max_tries=10):
+ROW_SELECTOR = ".gsc_a_tr"
+WAIT_SECONDS = 10
+MAX_TRIES = 10             # "Show more" clicks in a row that may load nothing before we stop
+# a profile that fails with one of these only had a bad page; anything else
+# may have killed the browser, so its driver is replaced
+PAGE_ERRORS = (TimeoutException, NoSuchElementException)
+
+
+def make_driver(driver_path=None, headless=True):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    driver_path = driver_path or ChromeDriverManager().install()
+    return webdriver.Chrome(service=Service(driver_path), options=options)
+
+
+class DriverPool:
+    """
+    A fixed set of Chrome drivers shared by worker threads; each is reused
+    across profiles.  A driver whose profile failed with something other than
+    a page error is quit and replaced by a fresh one on next use.
+    """
+
+    def __init__(self, size, headless=True, driver_path=None):
+        self.size = size
+        self.headless = headless
+        # resolve once, not per profile
+        self.driver_path = driver_path or ChromeDriverManager().install()
+        self.idle = queue.Queue()
+        for _ in range(size):
+            self.idle.put(None)                              # a free slot: start a driver in it
+        self.all = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        d = self.idle.get()
+        if d is None:
+            try:
+                d = make_driver(self.driver_path, self.headless)
+            except BaseException:
+                self.idle.put(None)
+                raise
+            with self.lock:
+                self.all.append(d)
+        try:
+            yield d
+        except PAGE_ERRORS:
+            self.idle.put(d)
+            raise
+        except BaseException:
+            self.discard(d)
+            self.idle.put(None)
+            raise
+        else:
+            self.idle.put(d)
+
+    def discard(self, d):
+        with self.lock:
+            self.all.remove(d)
+        try:
+            d.quit()
+        except Exception:
+            pass                  # already dead
+
+    def close(self):
+        for d in self.all:
+            d.quit()
+
+
+def row_count(driver):
+    return len(driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR))
+
+
+def load_all_publications(driver, max_tries=MAX_TRIES, timeout=WAIT_SECONDS):
     """Click 'Show more' until all publications are loaded."""
     attempts = 0
     while attempts < max_tries:
         try:
             btn = driver.find_element(By.ID, "gsc_bpf_more")
-            if 'disabled' in btn.get_attribute('class'):
+            if 'disabled' in (btn.get_attribute('class') or '') or btn.get_attribute('disabled'):
                 break
-            before = len(driver.find_elements(By.CSS_SELECTOR, ".gsc_a_tr"))
+            before = row_count(driver)
             btn.click()
-            time.sleep(2)
-            after = len(driver.find_elements(By.CSS_SELECTOR, ".gsc_a_tr"))
-            if after == before:
-                attempts += 1
-            else:
-                attempts = 0
-        except:
+            # wait for new rows instead of sleeping a fixed time
+            WebDriverWait(driver, timeout).until(
+                lambda d: row_count(d) > before
+                or 'disabled' in (d.find_element(By.ID, "gsc_bpf_more").get_attribute('class') or '')
+            )
+            attempts = 0 if row_count(driver) > before else attempts + 1
+        except TimeoutException:
+            attempts += 1
+        except Exception:
             break
 
-def scrape_scholar_profile(url):
+
+def scrape_scholar_profile(url, driver=None, max_tries=MAX_TRIES):
     """
     Scrape a single Google Scholar profile:
       – extract the author's name
       – load all pubs
       – return (name, single string of "Title (Cited by X); Title2 (Cited by Y); …")
+    Pass a `driver` to reuse one; otherwise a temporary one is started.
     """
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.get(url)
-    time.sleep(3)
-    # 1) get the name
-    author_name = driver.find_element(By.ID, "gsc_prf_in").text.strip()
-    # 2) load all pubs
-    load_all_publications(driver)
-    # 3) collect and format
-    entries = []
-    for row in driver.find_elements(By.CSS_SELECTOR, ".gsc_a_tr"):
-        title = row.find_element(By.CSS_SELECTOR, ".gsc_a_t a").text.strip()
-        try:
-            cites = row.find_element(By.CSS_SELECTOR, ".gsc_a_c a").text.strip() or "0"
-        except:
-            cites = "0"
-        entries.append(f"{title} (Cited by {cites})")
-    driver.quit()
-    return author_name, "; ".join(entries)
+    own_driver = driver is None
+    if own_driver:
+        driver = make_driver()
+    try:
+        driver.get(url)
+        WebDriverWait(driver, WAIT_SECONDS).until(
+            lambda d: d.find_elements(By.ID, "gsc_prf_in"))
+        # 1) get the name
+        author_name = driver.find_element(By.ID, "gsc_prf_in").text.strip()
+        # 2) load all pubs
+        load_all_publications(driver, max_tries)
+        # 3) collect and format
+        entries = []
+        for row in driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR):
+            title = row.find_element(By.CSS_SELECTOR, ".gsc_a_t a").text.strip()
+            try:
+                cites = row.find_element(By.CSS_SELECTOR, ".gsc_a_c a").text.strip() or "0"
+            except Exception:
+                cites = "0"
+            entries.append(f"{title} (Cited by {cites})")
+        return author_name, "; ".join(entries)
+    finally:
+        if own_driver:
+            driver.quit()
+
+
+# ------------------------------------------------------------------
+# Append-only checkpoint: one JSON line per finished profile
+# ------------------------------------------------------------------
+def load_checkpoint(path):
+    """{url: (name, pubs)} for every profile already scraped into `path`."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue          # torn last line from an interrupted run
+            done[rec["url"]] = (rec["name"], rec["publications"])
+    return done
+
+
+def scrape_all(urls, checkpoint, workers=4, headless=True, max_tries=MAX_TRIES,
+               driver_path=None):
+    """Scrape `urls` in parallel, skipping those in `checkpoint`; returns {url: (name, pubs)}."""
+    done = load_checkpoint(checkpoint)
+    todo = [u for u in dict.fromkeys(urls) if u not in done]
+    print(f"{len(done)} profiles already scraped, {len(todo)} to go")
+    if not todo:
+        return done
+
+    total = len(done) + len(todo)
+    os.makedirs(os.path.dirname(checkpoint) or ".", exist_ok=True)
+    pool = DriverPool(workers, headless, driver_path)
+    write_lock = threading.Lock()
+
+    def work(url):
+        with pool.driver() as driver:
+            return scrape_scholar_profile(url, driver, max_tries)
+
+    try:
+        with open(checkpoint, "a", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(work, u): u for u in todo}
+            for fut in as_completed(futures):
+                url = futures[fut]
+                try:
+                    name, pubs_str = fut.result()
+                except Exception as e:
+                    print(f"✗ {url}: {e}")
+                    continue
+                done[url] = (name, pubs_str)
+                with write_lock:
+                    out.write(json.dumps({"url": url, "name": name, "publications": pubs_str},
+                                         ensure_ascii=False) + "\n")
+                    out.flush()
+                print(f"✓ {name} ({len(done)}/{total})")
+    finally:
+        pool.close()
+    return done
+
 
 if __name__ == "__main__":
-    # Prepare output dict
-    all_scholars = {}
+    ap = argparse.ArgumentParser(description="Scrape Google Scholar profiles listed in Data.csv")
+    ap.add_argument("--csv", default="Data.csv")
+    ap.add_argument("--urls", nargs="*", help="scrape these URLs instead of the CSV column")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--checkpoint", default="scraped_data/all_scholars.jsonl")
+    ap.add_argument("--out", default="scraped_data/all_scholars.json")
+    ap.add_argument("--show-browser", action="store_true")
+    ap.add_argument("--driver", help="chromedriver to use instead of downloading one")
+    ap.add_argument("--max-tries", type=int, default=MAX_TRIES,
+                    help="'Show more' clicks in a row that may load nothing before a profile is done")
+    args = ap.parse_args()
 
     # Read URLs from Data.csv
-    with open("Data.csv", newline="", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            url = row.get("Google Scholar Link", "").strip()
-            if not url:
-                continue
-            print(f"Scraping {url} …")
-            name, pubs_str = scrape_scholar_profile(url)
-            all_scholars[name] = pubs_str
+    urls = args.urls
+    if not urls:
+        with open(args.csv, newline="", encoding="utf-8") as csvfile:
+            urls = [row.get("Google Scholar Link", "").strip() for row in csv.DictReader(csvfile)]
+            urls = [u for u in urls if u]
+
+    results = scrape_all(urls, args.checkpoint, args.workers, headless=not args.show_browser,
+                         max_tries=args.max_tries, driver_path=args.driver)
 
     # Save everything into one JSON
-    os.makedirs("scraped_data", exist_ok=True)
-    out_path = "scraped_data/all_scholars.json"
-    with open(out_path, "w", encoding="utf-8") as f:
+    all_scholars = {name: pubs for name, pubs in results.values()}
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
         json.dump(all_scholars, f, ensure_ascii=False, indent=4)
 
-    print(f"\nAll profiles saved to {out_path}")
\ No newline at end of file
+    print(f"\nAll profiles saved to {args.out}")
@@ -0,0 +1,413 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from embedding_pipeline import EmbeddingPipeline
+from facets import FacetIndex, build_facets, load_facets, save_facets
+from faiss_index import IndexSpec, TruncatedEmbeddings, build_faiss_index, configure, truncate
+from lexical_index import BM25_FILE, BM25Index
+from professor_index import ProfessorIndex
+
+INDEX_DIR = "vector_index"
+KEEP_VERSIONS = 2          # CURRENT and the one before it, to roll back to
+
+
+def chunk_key(text: str, model: str) -> str:
+    """Content address of one chunk's embedding (model name + chunk text)."""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+def corpus_fingerprint(documents, model: str) -> str:
+    """Hash of every chunk (text + metadata) and the model; changes when anything does."""
+    h = hashlib.sha256(model.encode("utf-8"))
+    for doc in documents:
+        h.update(doc.page_content.encode("utf-8"))
+        h.update(json.dumps(doc.metadata, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------------
+# 1.  Embedding store: append-only float32 matrix + one key per row
+# ------------------------------------------------------------------
+class EmbeddingCache:
+    """
+    On-disk, content-addressed embedding store.
+
+    Rows live in `vectors.f32` (raw float32, memory-mapped on load) and the
+    matching chunk keys in `keys.txt`, one per line.  New rows are appended,
+    so a crash mid-build keeps everything written before it; a half-written
+    append (rows without keys, or a torn last row or key) is cut back on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.vec_file = self.path / "vectors.f32"
+        self.key_file = self.path / "keys.txt"
+        self.meta_file = self.path / "meta.json"
+        self.dim = None
+        self.rows = {}
+        self._vectors = None
+        self._load()
+
+    def _load(self):
+        if not self.meta_file.exists():
+            return
+        self.dim = json.loads(self.meta_file.read_text("utf-8"))["dim"]
+        lines = self.key_file.read_text("utf-8").split("\n") if self.key_file.exists() else [""]
+        keys = lines[:-1]                       # the last line is unterminated (or empty)
+        row_bytes = 4 * self.dim
+        size = self.vec_file.stat().st_size if self.vec_file.exists() else 0
+        # a torn append leaves more of one than the other: trust the shorter and
+        # cut the other back, so the next append starts both files at the same row
+        n = min(len(keys), size // row_bytes)
+        if size != n * row_bytes:
+            with open(self.vec_file, "r+b") as f:
+                f.truncate(n * row_bytes)
+        if len(lines) != n + 1 or lines[-1]:
+            self.key_file.write_text("".join(f"{k}\n" for k in keys[:n]), "utf-8")
+        self.rows = {k: i for i, k in enumerate(keys[:n])}
+        self._map()
+
+    def _map(self):
+        self._vectors = (np.memmap(self.vec_file, dtype=np.float32, mode="r",
+                                   shape=(len(self.rows), self.dim)) if self.rows else None)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def get(self, key):
+        return self._vectors[self.rows[key]]
+
+    def add(self, keys, vectors) -> None:
+        """Append new (key, vector) pairs; keys already stored are ignored."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self.meta_file.write_text(json.dumps({"dim": self.dim}), "utf-8")
+        fresh = {k: v for k, v in zip(keys, vectors) if k not in self.rows}
+        if not fresh:
+            return
+        # vectors first, then keys: a key is only ever written after its row
+        with open(self.vec_file, "ab") as f:
+            f.write(np.stack(list(fresh.values())).tobytes())
+        with open(self.key_file, "a", encoding="utf-8") as f:
+            f.write("".join(f"{k}\n" for k in fresh))
+        start = len(self.rows)
+        self.rows.update((k, start + i) for i, k in enumerate(fresh))
+        self._map()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrap an Embeddings model so document vectors are served from an EmbeddingCache.
+    Misses go through an EmbeddingPipeline (`pipeline_options` are passed to it).
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, model: str,
+                 **pipeline_options):
+        self.underlying = underlying
+        self.cache = cache
+        self.model = model
+        self.misses = 0
+        self.pipeline = EmbeddingPipeline(underlying, cache, **pipeline_options)
+
+    def embed_documents(self, texts):
+        keys = [chunk_key(t, self.model) for t in texts]
+        missing = list({k: t for k, t in zip(keys, texts) if k not in self.cache}.items())
+        if missing:
+            self.pipeline.run([k for k, _ in missing], [t for _, t in missing])
+            self.misses += len(missing)
+        return [self.cache.get(k).tolist() for k in keys]
+
+    def embed_query(self, text):
+        return self.underlying.embed_query(text)
+
+
+# ------------------------------------------------------------------
+# 2.  Versioned index artifacts
+#
+#   vector_index/
+#     embeddings/              shared EmbeddingCache
+#     versions/<version>/      index.faiss (type per manifest["index"]), index.pkl (docstore), bm25.json.gz,
+#                              professors.json + professor_chunks.f16, facets.json, manifest.json
+#     CURRENT                  name of the version the app serves; only it and the
+#                              version before it are kept (KEEP_VERSIONS)
+# ------------------------------------------------------------------
+@dataclass
+class Artifact:
+    version: str
+    manifest: dict
+    vectorstore: FAISS
+    bm25: object
+    professors: object
+    facets: object = None
+
+
+def current_version(index_dir: str = INDEX_DIR):
+    pointer = Path(index_dir) / "CURRENT"
+    return pointer.read_text("utf-8").strip() if pointer.exists() else None
+
+
+def index_version(index_dir: str = INDEX_DIR) -> str:
+    """Version the app serves, used to invalidate downstream caches."""
+    return current_version(index_dir) or ""
+
+
+def version_dir(version: str, index_dir: str = INDEX_DIR) -> Path:
+    return Path(index_dir) / "versions" / version
+
+
+def set_current(version: str, index_dir: str = INDEX_DIR) -> None:
+    """Atomically point CURRENT at `version`."""
+    tmp = Path(index_dir) / "CURRENT.tmp"
+    tmp.write_text(version, "utf-8")
+    os.replace(tmp, Path(index_dir) / "CURRENT")
+
+
+def prune_versions(index_dir: str = INDEX_DIR, keep: int = KEEP_VERSIONS) -> list:
+    """
+    Delete all but CURRENT and the newest `keep` - 1 other versions (version
+    names start with their build time).  Returns the deleted versions.
+    """
+    root = Path(index_dir) / "versions"
+    current = current_version(index_dir)
+    others = sorted((p.name for p in root.iterdir() if p.is_dir() and p.name != current),
+                    reverse=True) if root.exists() else []
+    deleted = []
+    for version in others[max(keep - 1, 0):]:
+        try:
+            shutil.rmtree(root / version)
+            deleted.append(version)
+        except OSError as e:         # e.g. still memory-mapped by a running app on Windows
+            print(f"could not remove old version {version}: {e}")
+    return deleted
+
+
+def load_vectorstore(path, embeddings: Embeddings, spec: IndexSpec = None,
+                     mmap: bool = True) -> FAISS:
+    """Load a saved FAISS index, by default memory-mapped read-only."""
+    path = Path(path)
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    index = faiss.read_index(str(path / "index.faiss"), flags)
+    configure(index, spec or IndexSpec())
+    # index.pkl is written by FAISS.save_local from our own build, not user input
+    with open(path / "index.pkl", "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def load_artifact(make_embeddings, index_dir: str = INDEX_DIR, version: str = None) -> Artifact:
+    """
+    Load the CURRENT (or given) prebuilt version; nothing is embedded or rebuilt.
+    `make_embeddings(model)` builds the query embedder for the manifest's model.
+    """
+    version = version or current_version(index_dir)
+    if version is None:
+        raise FileNotFoundError(f"no index built in {index_dir!r} – run `python build_index.py`")
+    path = version_dir(version, index_dir)
+    manifest = json.loads((path / "manifest.json").read_text("utf-8"))
+    spec = IndexSpec.from_dict(manifest.get("index"))
+    embeddings = make_embeddings(manifest["model"])
+    if spec.dim:
+        embeddings = TruncatedEmbeddings(embeddings, spec.dim)
+    vectorstore = load_vectorstore(path, embeddings, spec)
+    professors = ProfessorIndex.load(path)
+    return Artifact(
+        version=version,
+        manifest=manifest,
+        vectorstore=vectorstore,
+        bm25=BM25Index.load(path / BM25_FILE),
+        professors=professors,
+        facets=FacetIndex(load_facets(path), professors, vectorstore),
+    )
+
+
+def chunk_ids(documents) -> list:
+    """
+    Stable docstore ids: the same professor and chunk text always get the
+    same id, so a sync can find and replace exactly one professor's chunks.
+    """
+    seen, ids = {}, []
+    for doc in documents:
+        base = f"{doc.metadata['professor_id']}\n{doc.page_content}"
+        n = seen[base] = seen.get(base, -1) + 1
+        ids.append(hashlib.sha256(f"{base}\n{n}".encode("utf-8")).hexdigest()[:32])
+    return ids
+
+
+def professor_hashes(documents) -> dict:
+    """{professor id: hash of that professor's chunks and metadata}, for diffing builds."""
+    hashes = {}
+    for doc in documents:
+        h = hashes.setdefault(doc.metadata["professor_id"], hashlib.sha256())
+        h.update(doc.page_content.encode("utf-8"))
+        h.update(json.dumps(doc.metadata, sort_keys=True, default=str).encode("utf-8"))
+    return {pid: h.hexdigest()[:16] for pid, h in hashes.items()}
+
+
+def _print_embedding(cached) -> None:
+    if cached.misses:
+        r = cached.pipeline.report()
+        print(f"  embedded {r['chunks']} chunks / {r['tokens']} tokens in {r['seconds']}s "
+              f"({r['chunks_per_s']} chunks/s, {r['tokens_per_s']} tokens/s; "
+              f"{r['requests']} requests, {r['retries']} retries, "
+              f"{r['throttled_seconds']}s waiting on the rate budget)")
+
+
+def _write_version(vectorstore, vectors, fingerprint, hashes, model, spec, cached,
+                   start, index_dir, extra_manifest, keep_versions) -> str:
+    """
+    Save `vectorstore` plus its BM25 / professor indexes as a new version,
+    make it CURRENT and prune older versions down to `keep_versions`.
+    """
+    version = f"{time.strftime('%Y%m%d-%H%M%S')}-{fingerprint[:8]}"
+    path = version_dir(version, index_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    vectorstore.save_local(str(path))
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(len(vectorstore.index_to_docstore_id))]
+    docs = [vectorstore.docstore.search(i) for i in ids]
+    texts = [doc.page_content for doc in docs]
+    BM25Index.build(ids, texts, version).save(path / BM25_FILE)
+    professors = ProfessorIndex.build(vectorstore, path, version, vectors=vectors)
+    save_facets(build_facets(docs), path)
+
+    manifest = {
+        "version": version,
+        "fingerprint": fingerprint,
+        "model": model,
+        "dim": int(vectorstore.index.d),
+        "index": spec.to_dict(),
+        "index_bytes": (path / "index.faiss").stat().st_size,
+        "chunks": len(texts),
+        "professors": len(professors.ids),
+        "newly_embedded": cached.misses,
+        "embedding": cached.pipeline.report(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "build_seconds": round(time.perf_counter() - start, 2),
+        "files": sorted(p.name for p in path.iterdir()),
+        "professor_id_hashes": hashes,
+        **(extra_manifest or {}),
+    }
+    (path / "manifest.json").write_text(json.dumps(manifest, indent=2), "utf-8")
+    set_current(version, index_dir)
+    prune_versions(index_dir, keep_versions)
+    return version
+
+
+def build_artifact(documents, embeddings: Embeddings, model: str,
+                   index_dir: str = INDEX_DIR, extra_manifest: dict = None,
+                   spec: IndexSpec = None, embed_options: dict = None,
+                   keep_versions: int = KEEP_VERSIONS) -> str:
+    """
+    Build a new version from `documents` and make it CURRENT.  Returns the
+    version; if CURRENT already holds the same chunks and index settings it
+    is reused as-is.  Only chunks missing from the embedding cache are sent
+    to the API, batched and rate-limited per `embed_options` (see
+    EmbeddingPipeline); the cache always keeps full-width vectors, so
+    changing `spec` (index type, truncation, float16) never re-embeds.
+    """
+    start = time.perf_counter()
+    spec = spec or IndexSpec()
+    fingerprint = corpus_fingerprint(documents, model)
+    current = current_version(index_dir)
+    if current is not None:
+        manifest = json.loads((version_dir(current, index_dir) / "manifest.json").read_text("utf-8"))
+        if (manifest.get("fingerprint") == fingerprint
+                and IndexSpec.from_dict(manifest.get("index")) == spec):
+            print(f"Index {current} is up to date ({manifest['chunks']} chunks)")
+            return current
+
+    cached = CachedEmbeddings(embeddings, EmbeddingCache(os.path.join(index_dir, "embeddings")),
+                              model, **(embed_options or {}))
+    texts = [doc.page_content for doc in documents]
+    vectors = truncate(cached.embed_documents(texts), spec.dim)
+    query_embeddings = TruncatedEmbeddings(embeddings, spec.dim) if spec.dim else embeddings
+    vectorstore = FAISS(query_embeddings, build_faiss_index(vectors, spec),
+                        InMemoryDocstore(), {})
+    vectorstore.add_embeddings(list(zip(texts, vectors)),
+                               metadatas=[doc.metadata for doc in documents],
+                               ids=chunk_ids(documents))
+
+    version = _write_version(vectorstore, vectors, fingerprint, professor_hashes(documents),
+                             model, spec, cached, start, index_dir, extra_manifest,
+                             keep_versions)
+    print(f"Built index {version}: {len(texts)} chunks, {cached.misses} newly embedded")
+    _print_embedding(cached)
+    return version
+
+
+def sync_artifact(documents, embeddings: Embeddings, model: str,
+                  index_dir: str = INDEX_DIR, extra_manifest: dict = None,
+                  embed_options: dict = None, keep_versions: int = KEEP_VERSIONS) -> str:
+    """
+    Bring CURRENT up to date with `documents` by touching only the professors
+    whose chunks or metadata changed since it was built: their old chunks are
+    deleted by id, new ones embedded and added, and the result is written as
+    a new version and swapped in atomically.  Falls back to build_artifact
+    when there is nothing to diff against, or for index types that cannot
+    delete in place (their cached vectors are simply re-indexed).
+    """
+    start = time.perf_counter()
+    current = current_version(index_dir)
+    old = (json.loads((version_dir(current, index_dir) / "manifest.json").read_text("utf-8"))
+           if current is not None else {})
+    spec = IndexSpec.from_dict(old.get("index"))
+    # versions from before professor ids (keyed by name) are rebuilt, not diffed
+    if "professor_id_hashes" not in old or old["model"] != model or spec.kind != "flat":
+        return build_artifact(documents, embeddings, model, index_dir, extra_manifest,
+                              spec, embed_options, keep_versions)
+
+    fingerprint = corpus_fingerprint(documents, model)
+    if old["fingerprint"] == fingerprint:
+        print(f"Index {current} is up to date ({old['chunks']} chunks)")
+        return current
+    hashes = professor_hashes(documents)
+    old_hashes = old["professor_id_hashes"]
+    changed = {pid for pid, h in hashes.items() if old_hashes.get(pid) != h}
+    removed = set(old_hashes) - set(hashes)
+
+    query_embeddings = TruncatedEmbeddings(embeddings, spec.dim) if spec.dim else embeddings
+    vectorstore = load_vectorstore(version_dir(current, index_dir), query_embeddings, spec,
+                                   mmap=False)
+    stale = [doc_id for doc_id in vectorstore.index_to_docstore_id.values()
+             if vectorstore.docstore.search(doc_id).metadata["professor_id"] in changed | removed]
+    if stale:
+        vectorstore.delete(stale)
+
+    cache = EmbeddingCache(os.path.join(index_dir, "embeddings"))
+    cached = CachedEmbeddings(embeddings, cache, model, **(embed_options or {}))
+    fresh = [doc for doc in documents if doc.metadata["professor_id"] in changed]
+    if fresh:
+        texts = [doc.page_content for doc in fresh]
+        vectorstore.add_embeddings(list(zip(texts, truncate(cached.embed_documents(texts), spec.dim))),
+                                   metadatas=[doc.metadata for doc in fresh],
+                                   ids=chunk_ids(fresh))
+
+    # every row's vector, in index order, for the professor index – all cached by now
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(len(vectorstore.index_to_docstore_id))]
+    vectors = truncate(np.stack([
+        cache.get(chunk_key(vectorstore.docstore.search(i).page_content, model)) for i in ids
+    ]), spec.dim)
+    version = _write_version(vectorstore, vectors, fingerprint, hashes, model, spec, cached,
+                             start, index_dir, extra_manifest, keep_versions)
+    added = changed - set(old_hashes)
+    print(f"Synced {current} → {version}: {len(added)} added, {len(changed - added)} updated, "
+          f"{len(removed)} removed professors ({len(stale)} chunks dropped, {len(fresh)} added, "
+          f"{cached.misses} newly embedded)")
+    _print_embedding(cached)
+    return version
@@ -0,0 +1,92 @@
+import gzip
+import heapq
+import json
+import math
+import re
+from collections import Counter, defaultdict
+
+BM25_FILE = "bm25.json.gz"
+
+_WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+STOPWORDS = set("""
+a about an and are as at be by for from has have in into is it its of on or our
+that the their this to was were which with we using based study studies research
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased word tokens plus adjacent-word bigrams, so exact phrases score higher."""
+    words = [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the same chunks as the vector index, keyed by docstore id.
+    Pure Python: querying it needs no embedding call.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = []              # position → docstore id
+        self.lengths = []          # position → token count
+        self.postings = {}         # term → [[position, term frequency], …]
+        self.fingerprint = ""
+        self._position = None      # docstore id → position, built on first filtered search
+
+    @classmethod
+    def build(cls, ids, texts, fingerprint: str = "", **kw):
+        index = cls(**kw)
+        index.ids = list(ids)
+        index.fingerprint = fingerprint
+        postings = defaultdict(list)
+        for pos, text in enumerate(texts):
+            tf = Counter(tokenize(text))
+            index.lengths.append(sum(tf.values()))
+            for term, n in tf.items():
+                postings[term].append([pos, n])
+        index.postings = dict(postings)
+        return index
+
+    def search(self, query: str, k: int = 10, allowed=None) -> list:
+        """
+        Top-k (docstore id, score).  `allowed` optionally restricts scoring to
+        a set of ids; idf stays corpus-wide so filtered scores are comparable.
+        """
+        n_docs = len(self.ids)
+        if not n_docs:
+            return []
+        avg_len = sum(self.lengths) / n_docs
+        if allowed is not None:
+            if self._position is None:
+                self._position = {doc_id: pos for pos, doc_id in enumerate(self.ids)}
+            allowed = {self._position[i] for i in allowed if i in self._position}
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for pos, tf in plist:
+                if allowed is not None and pos not in allowed:
+                    continue
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[pos] / avg_len)
+                scores[pos] += idf * tf * (self.k1 + 1) / norm
+        ranked = heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+        return [(self.ids[pos], s) for pos, s in ranked]
+
+    def save(self, path) -> None:
+        data = {"k1": self.k1, "b": self.b, "fingerprint": self.fingerprint,
+                "ids": self.ids, "lengths": self.lengths, "postings": self.postings}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["k1"], data["b"])
+        index.fingerprint = data["fingerprint"]
+        index.ids, index.lengths, index.postings = data["ids"], data["lengths"], data["postings"]
+        return index
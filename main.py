@@ -1,15 +1,24 @@
-import streamlit as st
-import pandas as pd
+import time
+_script_start = time.perf_counter()
+
 import json
-import openai
-from dotenv import load_dotenv
-from langchain.docstore.document import Document
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import logging
 import os
+import threading
+
+import streamlit as st
+
+from call_pool import POOL, PoolBusy
+from facets import current_facets
+from query_cache import TwoTierCache, Uncached, query_hash, text_hash
+from rerank import RerankResult, rerank
+from summarize import stream_summaries
+from tracing import tracing
 
+# Trace spans and startup timings are logged at INFO; set LOG_LEVEL=WARNING to
+# silence them.  basicConfig is a no-op on reruns, once the handler exists.
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+                    format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
 # Fetch the OpenAI API key from environment variables
 # Retrieve the key
@@ -18,138 +27,162 @@ api_key = st.secrets["OPENAI_API_KEY"]
 # (Optional) expose it as an env‑var for libraries that auto‑detect it
 os.environ["OPENAI_API_KEY"] = api_key
 
-from openai import OpenAI
-
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-response = client.chat.completions.create(
-    model="gpt-4o-mini",
-    messages=[{"role": "user", "content": "Hello!"}],
-)
-
-# Check if the OpenAI API key is set
-if api_key:
-    print("OpenAI API key is set")
-else:
-    print("OpenAI API key is not set")
-
 
 # --- Resource Loading Function ---
-# Cache the resource loading to avoid reloading on every run.
-@st.cache_resource
-def load_resources():
-    # Load the CSV file with professor metadata.
-    csv_file = 'Data.csv'
-    df = pd.read_csv(csv_file)
-    # Create a full name column.
-    df['name'] = df['First Name:'] + ' ' + df['Last Name:']
-    # Create a CV key column.
-    df['cv_key'] = df['name'] + " CV.pdf"
-    # Build metadata DataFrame.
-    metadata_columns = ['name', 'WashU Email Address:', 'School:', 'Department:', 'Title:']
-    professors_metadata = df[metadata_columns].copy()
-
-    # Load the JSON file containing CV texts.
-    json_file = 'combined.json'
-    with open(json_file, 'r', encoding='utf-8') as f:
-        cv_data = json.load(f)
-    # Map each professor's cv_key to its corresponding CV text.
-    cv_series = df['cv_key'].map(cv_data).fillna("")
-    professors_metadata['cv'] = cv_series
-
-    # Filter for professors with non-empty CV text.
-    df_nonempty = professors_metadata[professors_metadata['cv'] != ""]
-    df_nonempty = pd.DataFrame(df_nonempty)
-
-    # Define a text spliter
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,           # ~½-1 page
-        chunk_overlap=200          # keeps context
-    )
-
-    # Create a Document for each professor's CV (with metadata).
-    documents = []
-    for idx, row in df_nonempty.iterrows():
-        metadata = {
-            "name": row['name'],
-            "WashU Email Address:": row['WashU Email Address:'],
-            "School:": row['School:'],
-            "Department:": row['Department:'],
-            "Title:": row['Title:']
-        }
-
-        # Split the CV and keep the metadata on every chunk
-        for chunk in text_splitter.split_text(str(row["cv"])):
-            documents.append(Document(page_content=chunk, metadata=metadata))
-
-    # Build the vector store using FAISS (cloud-compatible)
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
-    
-    # Create FAISS vector store from documents
-    vectorstore = FAISS.from_documents(documents, embeddings)
-
-    # Build the retriever based on the vectorstore
-    retriever = vectorstore.as_retriever(
-        search_kwargs={"k": 10}  # Return top 10 most similar documents
+# The index is built offline by `python build_index.py`; this only loads the
+# given prebuilt version.  LangChain / FAISS are imported here, on first
+# search, so the page itself renders without them.  Cached for the process,
+# one version at a time: when `build_index.py --sync` moves CURRENT, the next
+# search loads the new version and the old one is dropped.
+@st.cache_resource(max_entries=1)
+def load_resources(version):
+    start = time.perf_counter()
+    from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+    from index_store import load_artifact
+    from retrieval import HybridRetriever
+    from rerank import get_reranker
+
+    # Load the prebuilt index; its manifest records the embedding model it needs
+    artifact = load_artifact(lambda model: OpenAIEmbeddings(model=model), version=version or None)
+
+    # Build the retriever: "hybrid" (vector + BM25), "vector" or "lexical" (no embedding call)
+    retriever = HybridRetriever(
+        artifact.vectorstore, artifact.bm25,
+        mode=os.environ.get("RETRIEVAL_MODE", "hybrid"),
+        k=10,  # Return top 10 most similar documents
+        professors=artifact.professors,
+        facets=artifact.facets,
     )
 
     # Set up the LLM.
     llm = ChatOpenAI(model = "gpt-4o")
 
-    return retriever, llm
+    # Rerank stage: "llm" (one structured call), "cross-encoder" or "stub"
+    reranker = get_reranker(os.environ.get("RERANKER", "llm"), llm)
+
+    load_seconds = time.perf_counter() - start
+    logging.info(json.dumps({"event": "load_resources", "version": artifact.version,
+                             "seconds": round(load_seconds, 3)}))
+    return retriever, llm, reranker, artifact.version, load_seconds
+
+
+# Query/summary cache shared by every session in this process.
+# Set QUERY_CACHE_DB to a file path to also keep entries across restarts.
+@st.cache_resource
+def load_query_cache():
+    return TwoTierCache(sqlite_path=os.environ.get("QUERY_CACHE_DB"))
+
+query_cache = load_query_cache()
 
-# Load resources once.
-retriever, llm = load_resources()
+
+def resources():
+    """Index, LLM, reranker and the index version they serve, loaded on first use."""
+    from index_store import index_version
+    retriever, llm, reranker, version, load_seconds = load_resources(index_version())
+    query_cache.set_version(version)
+    st.session_state["index_loaded"] = (version, load_seconds)
+    return retriever, llm, reranker, version
 
 
 # --- Similarity Search Function ---
-def search_research(query):
-    results = retriever.invoke(query)
+def retrieve_professors(query, n=10, filters=None):
+    from langchain_core.documents import Document
+    retriever, _, _, version = resources()
+
+    # one best chunk for each of the top n distinct professors (within `filters`)
+    facet_key = tuple(sorted((f, tuple(sorted(v))) for f, v in (filters or {}).items() if v))
+    key = ("professors", retriever.mode, n, facet_key, query_hash(query))
+
+    def compute():
+        docs = retriever.search_professors(query, n, filters)
+        hits = [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+        # a hybrid search that fell back to BM25 is not cached under the hybrid key
+        return Uncached(hits) if docs.degraded else hits
+
+    # the pool's single-flight key names the version too: during a --sync switch a
+    # call running against the old index must not be shared with the new one
+    hits = query_cache.get_or_compute(key, lambda: POOL.call((version, *key), compute))
+    return [Document(**hit) for hit in hits]
+
 
-    # 👇 keep only the first chunk we see for each professor
-    unique = {}
-    for doc in results:
-        name = doc.metadata["name"]
-        if name not in unique:        # first (i.e., most-similar) chunk wins
-            unique[name] = doc
-        if len(unique) == 10:      # stop once we have enough unique profs
-            break
-    results = list(unique.values())
+def format_result(i, doc, summary):
+    metadata = doc.metadata
+    output_lines = []
+    output_lines.append(f"Result {i}:")
+    output_lines.append("Name: " + metadata.get("name", "N/A"))
+    output_lines.append("WashU Email Address: " + metadata.get("WashU Email Address:", "N/A"))
+    output_lines.append("School: " + metadata.get("School:", "N/A"))
+    output_lines.append("Department: " + metadata.get("Department:", "N/A"))
+    output_lines.append("Title: " + metadata.get("Title:", "N/A"))
+    output_lines.append("-" * 40)
+    output_lines.append("Summary:")
+    output_lines.append(summary)
+    output_lines.append("=" * 40 + "\n")
+    return "\n".join(output_lines)
+
+
+def cached_rerank(query, candidates):
+    _, _, reranker, version = resources()
+    key = ("rerank", os.environ.get("RERANKER", "llm"), query_hash(query),
+           *(text_hash(d.page_content) for d in candidates))
+
+    def compute():
+        results = rerank(reranker, query, candidates)
+        rows = [{"i": candidates.index(r.doc), "score": r.score, "rationale": r.rationale}
+                for r in results]
+        # a failed rerank (kept in retrieval order) is not cached, so the next search retries
+        return Uncached(rows) if any(r.degraded for r in results) else rows
+
+    rows = query_cache.get_or_compute(key, lambda: POOL.call((version, *key), compute))
+    return [RerankResult(candidates[row["i"]], row["score"], True, row["rationale"])
+            for row in rows]
 
 
+def search_research(query, on_result=None, cancel=None, filters=None):
+    """
+    Retrieve candidate professors (only those matching `filters`, e.g.
+    {"School:": ["School of Medicine"]}), rerank them in a single call and
+    explain the ones kept.  `on_result(i, doc, summary)` is called as each
+    result is ready; the returned text lists all results in rank order.
+    """
+    _, llm, _, _ = resources()
+    # Every embed / search / LLM call below records a span on this trace;
+    # cache hits record nothing.  The breakdown is logged as JSON on exit.
+    with tracing("search") as trace:
+        st.session_state["last_trace"] = trace
+        candidates = retrieve_professors(query, filters=filters)
+        kept = cached_rerank(query, candidates)
+
+        if all(r.rationale for r in kept):
+            # the LLM reranker already explained every match
+            summaries = ((i, r.doc, r.rationale) for i, r in enumerate(kept, start=1))
+        else:
+            # local scorers only decide keep/drop – summarize the survivors
+            summaries = stream_summaries(llm, query, [r.doc for r in kept], cancel=cancel,
+                                         cache=query_cache)
+
+        blocks = {}
+        for i, doc, summary in summaries:
+            blocks[i] = format_result(i, doc, summary)
+            if on_result is not None:
+                on_result(i, doc, summary)
+
     output_lines = []
     output_lines.append(f"Research Query: {query}\n")
     output_lines.append("Matching Professors:\n")
-    for i, doc in enumerate(results, start=1):
-        metadata = doc.metadata
-        output_lines.append(f"Result {i}:")
-        output_lines.append("Name: " + metadata.get("name", "N/A"))
-        output_lines.append("WashU Email Address: " + metadata.get("WashU Email Address:", "N/A"))
-        output_lines.append("School: " + metadata.get("School:", "N/A"))
-        output_lines.append("Department: " + metadata.get("Department:", "N/A"))
-        output_lines.append("Title: " + metadata.get("Title:", "N/A"))
-        output_lines.append("-" * 40)
-
-        # Extract the professor's CV (adjust length as needed)
-        snippet = doc.page_content[:8290]
- 
-        # Create the prompt for the LLM.
-        prompt = (
-            f"Research Query: '{query}'.\n"
-            f"Professor: {metadata.get('name', 'N/A')}.\n"
-            f"CV Snippet: {snippet}\n\n"
-            "Based on the research query and the attached CV above, please provide a short summary "
-            "explaining why this professor was selected, highlighting how the CV content matches "
-            "the research interests. Focus on the positives and the matching components."
-        )
-        # Generate the summary using the LLM.
-        result = llm.invoke(prompt)
-        summary = result.content if hasattr(result, "content") else result
-        output_lines.append("Summary:")
-        output_lines.append(summary)
-        output_lines.append("=" * 40 + "\n")
+    output_lines.extend(blocks[i] for i in sorted(blocks))
     return "\n".join(output_lines)
 
 
+def render_card(slot, i, doc, summary):
+    metadata = doc.metadata
+    with slot.container():
+        st.markdown(f"**{i}. {metadata.get('name', 'N/A')}** — "
+                    f"{metadata.get('Department:', 'N/A')}, {metadata.get('School:', 'N/A')}")
+        st.caption(metadata.get("WashU Email Address:", "N/A"))
+        st.write(summary)
+
+
 
 
 st.markdown(
@@ -185,6 +218,18 @@ st.markdown(
 # Text box for the search query.
 query = st.text_area("Specify the expertise you are looking for (At least 20 words):", "Find biomedical imaging researcher exploring optical coherence tomography photonic chip development heart organoid analysis ultrafast noninvasive 3D imaging innovations platform.")
 
+# Optional School / Department filters, applied inside the index search.
+facets = current_facets()
+filters = {}
+if facets:
+    col_school, col_department = st.columns(2)
+    schools = col_school.multiselect("School", sorted(facets.get("School:", {})))
+    in_schools = {p for s in schools for p in facets["School:"][s]}
+    departments = col_department.multiselect("Department", sorted(
+        d for d, ids in facets.get("Department:", {}).items()
+        if not schools or in_schools.intersection(ids)))
+    filters = {"School:": schools, "Department:": departments}
+
 min_words = 20
 
 # When the button is clicked, perform the search.
@@ -196,38 +241,62 @@ if st.button("Search"):
                 f"Query too short. Please provide at least {min_words} words "
             )
     elif len(query.split()) >= min_words:
-        with st.spinner("Searching..."):
-            finalresults = search_research(query)
-            
-            filter_prompt = PromptTemplate.from_template(
-            """
-            You are matching a user's research inquiry to a list of researchers.
-
-            • Carefully read the inquiry and each researcher's portfolio.  
-            • Keep a researcher **only if** their expertise meaningfully aligns with the inquiry.  
-            • Return the portfolios of the selected researchers **exactly as-is** (no edits).  
-
-            User inquiry:
-            {query}
-
-            Researchers' portfolios:
-            {finalresults}
-            """
-            )
+        # A new search cancels whatever the previous one still has queued.
+        previous = st.session_state.get("search_cancel")
+        if previous is not None:
+            previous.set()
+        cancel = threading.Event()
+        st.session_state["search_cancel"] = cancel
 
+        # One placeholder per rank so cards stay in order while they stream in.
+        slots = [st.empty() for _ in range(10)]
+        shown = []
 
-            #invoke the chain
-            filtered_output = (filter_prompt | llm).invoke(
-               {"query": query, "finalresults": finalresults}      # key matches {results}
-            )
-            
-            display_text = (
-                filtered_output.content          # ChatOpenAI / ChatMessage object
-                if hasattr(filtered_output, "content")
-                else str(filtered_output)        # fallback for plain-string LLMs
-            )
+        def show(i, doc, summary):
+            render_card(slots[i - 1], i, doc, summary)
+            shown.append(i)
 
-                        
-            st.text_area("Results", display_text, height=600)
+        with st.spinner("Searching..."):
+            try:
+                finalresults = search_research(query, on_result=show, cancel=cancel,
+                                               filters=filters)
+            except PoolBusy:
+                finalresults = None
+                st.warning("Too many searches are running right now. Please try again in a moment.")
+
+            if finalresults is not None:
+                if not shown:
+                    st.info("No professors matched this query closely enough.")
+                st.text_area("Results", finalresults, height=600)
     else:
         st.error("Please enter a search query.")
+
+stats = query_cache.stats()
+st.sidebar.caption(
+    f"Cache: {stats['memory_hits']} memory / {stats['disk_hits']} disk hits, "
+    f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)"
+)
+pool = POOL.stats()
+st.sidebar.caption(
+    f"LLM queue: {pool['queue_depth']} waiting, {pool['running']} running, "
+    f"wait p95 {pool['wait_p95_ms']:.0f} ms, {pool['coalesced']} calls shared"
+)
+
+# Per-stage timing, tokens and estimated cost of the last search in this session
+trace = st.session_state.get("last_trace")
+if st.sidebar.checkbox("Show timing breakdown") and trace is not None:
+    st.sidebar.table(trace.breakdown())
+    cost = sum(row["cost_usd"] for row in trace.breakdown())
+    st.sidebar.caption(f"Search took {trace.wall:.2f}s, about ${cost:.4f}")
+
+# Cold-start tracking: how long this script run took to render, and how long
+# the (process-wide, first-search) index load took.
+script_seconds = time.perf_counter() - _script_start
+if "startup_logged" not in st.session_state:
+    st.session_state["startup_logged"] = True
+    logging.info(json.dumps({"event": "startup", "script_seconds": round(script_seconds, 3)}))
+loaded = st.session_state.get("index_loaded")
+st.sidebar.caption(
+    f"Page rendered in {script_seconds * 1000:.0f} ms"
+    + (f"; index {loaded[0]} loaded in {loaded[1]:.1f}s" if loaded else "")
+)
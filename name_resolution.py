@@ -0,0 +1,308 @@
+import hashlib
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import pandas as pd
+
+MATCH_THRESHOLD = 0.9      # similarity at which a name is merged into an existing professor
+AMBIGUITY_MARGIN = 0.05    # a runner-up this close to the best match makes it ambiguous
+AMBIGUOUS_MIN = 0.85       # below MATCH_THRESHOLD but this close to someone: ambiguous, not new
+LAST_MIN = 0.8             # surnames less similar than this never match
+NICKNAME_SIMILARITY = 0.95
+PREFIX_SIMILARITY = 0.7    # "Jing" / "Jingyi": usually a different person, never merged on its own
+EMAIL_SCAN_CHARS = 3000    # emails are read from the header of a CV / page only
+MAX_POSTING = 500          # trigrams shared by more names than this are too common to block on
+GRAM_CANDIDATES = 20
+
+CREDENTIALS = {"phd", "md", "mph", "ms", "msc", "mba", "jd", "dds", "pharmd", "rn",
+               "facs", "jr", "sr", "ii", "iii"}
+TITLES = {"dr", "prof", "professor"}
+
+# given name → its common short forms; a name is only merged with its own short
+# forms, not with every name it is a prefix of
+NICKNAMES = {
+    "alexander": ("alex", "sandy"), "alexandra": ("alex", "sandy", "sasha"),
+    "andrew": ("andy", "drew"), "anthony": ("tony",), "benjamin": ("ben",),
+    "catherine": ("cathy", "kate"), "katherine": ("kathy", "kate", "katie"),
+    "charles": ("charlie", "chuck"), "christopher": ("chris",), "christine": ("chris",),
+    "daniel": ("dan", "danny"), "david": ("dave",), "deborah": ("deb", "debbie"),
+    "edward": ("ed", "eddie", "ted"), "elizabeth": ("liz", "beth", "betsy"),
+    "frederick": ("fred",), "gregory": ("greg",), "henry": ("hank", "harry"),
+    "james": ("jim", "jimmy", "jamie"), "jeffrey": ("jeff",), "jennifer": ("jen", "jenny"),
+    "john": ("jack", "johnny"), "jonathan": ("jon",), "joseph": ("joe",),
+    "joshua": ("josh",), "kenneth": ("ken",), "lawrence": ("larry",),
+    "margaret": ("maggie", "meg", "peggy"), "matthew": ("matt",), "michael": ("mike",),
+    "nathaniel": ("nate", "nat"), "nicholas": ("nick",), "patricia": ("pat", "patty"),
+    "patrick": ("pat",), "philip": ("phil",), "rebecca": ("becky",),
+    "richard": ("rick", "dick"), "robert": ("bob", "rob", "bobby"), "ronald": ("ron",),
+    "samuel": ("sam",), "samantha": ("sam",), "stephen": ("steve",), "steven": ("steve",),
+    "susan": ("sue",), "theodore": ("ted", "theo"), "thomas": ("tom",),
+    "timothy": ("tim",), "victoria": ("vicky",), "william": ("bill", "will", "billy"),
+    "zachary": ("zach",),
+}
+_NICKNAME_OF = defaultdict(set)            # name or short form → the full names it stands for
+for _full, _short in NICKNAMES.items():
+    for _n in (_full,) + _short:
+        _NICKNAME_OF[_n].add(_full)
+
+_FILE_SUFFIX = re.compile(r"\s+(?:cv|gs)(?:\.pdf)?\s*$", re.I)
+_NICKNAME = re.compile(r"\(([^)]*)\)|\"([^\"]*)\"|“([^”]*)”")
+_EMAIL = re.compile(r"([A-Za-z0-9._%+-]+)\s*(?:@|\(at\)|\[at\])\s*((?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,})")
+
+
+def _tokens(text: str) -> list:
+    """Lowercase ASCII name tokens; "Xue-Yan" and "O'Neil" stay one token."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    text = re.sub(r"[.'’-]", "", text)
+    return re.findall(r"[a-z0-9]+", text)
+
+
+@dataclass(frozen=True)
+class ParsedName:
+    given: tuple          # first and middle names
+    last: str
+    nicknames: tuple = ()
+
+    @property
+    def key(self) -> str:
+        return " ".join(self.given + (self.last,))
+
+    def swapped(self):
+        """Family name first ("Chen Yuran") read the other way round."""
+        if not self.given:
+            return self
+        return ParsedName((self.last,) + self.given[1:], self.given[0], self.nicknames)
+
+
+def parse_name(raw: str) -> ParsedName:
+    """
+    "Yuran (Alex) Chen", 'Siyan "Stewart" Cao, MD PhD', "Li, Xianglin",
+    "Xianglin Li CV.pdf" → given names, surname and nicknames, normalized.
+    """
+    raw = _FILE_SUFFIX.sub("", raw or "")
+    nicknames = tuple(t for m in _NICKNAME.finditer(raw) for g in m.groups() if g
+                      for t in _tokens(g))
+    raw = _NICKNAME.sub(" ", raw)
+    if "," in raw:
+        head, tail = raw.split(",", 1)
+        tail_tokens = _tokens(tail)
+        if tail_tokens and not set(tail_tokens) <= CREDENTIALS:
+            raw = f"{tail} {head}"              # "Last, First"
+        else:
+            raw = head
+    tokens = [t for t in _tokens(raw) if t not in TITLES]
+    while len(tokens) > 1 and tokens[-1] in CREDENTIALS:
+        tokens.pop()
+    if not tokens:
+        return ParsedName((), "", nicknames)
+    return ParsedName(tuple(tokens[:-1]), tokens[-1], nicknames)
+
+
+def soundex(token: str) -> str:
+    codes = {c: str(d) for d, letters in enumerate(
+        ["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+    out, last = token[:1], codes.get(token[:1], "")
+    for c in token[1:]:
+        code = codes.get(c, "")
+        if code and code != "0" and code != last:
+            out += code
+        if c not in "hw":
+            last = code
+    return (out + "000")[:4]
+
+
+@lru_cache(maxsize=1 << 16)
+def _ratio(a: str, b: str) -> float:
+    """SequenceMatcher ratio; 0 when the lengths alone put it below LAST_MIN."""
+    if 2 * min(len(a), len(b)) / (len(a) + len(b) or 1) < LAST_MIN:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _given_similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    short, long = sorted((a, b), key=len)
+    if len(short) == 1:
+        return 0.85 if long.startswith(short) else 0.0     # an initial
+    if _NICKNAME_OF.get(a, set()) & _NICKNAME_OF.get(b, set()):
+        return NICKNAME_SIMILARITY                          # Alex / Alexander
+    if long.startswith(short):
+        return PREFIX_SIMILARITY                            # Jing / Jingyi
+    return _ratio(a, b)
+
+
+def name_similarity(a: ParsedName, b: ParsedName) -> float:
+    """
+    0-1; surname and given names weigh equally.  The given-name part is
+    mostly the best-matching pair (nicknames included), plus a little for
+    how well each of `a`'s given names matches, so that "Alexander Y." prefers
+    "Yuran (Alex)" over another Y.
+    """
+    def score(a, b):
+        last = 1.0 if a.last == b.last else _ratio(a.last, b.last)
+        if last < LAST_MIN:
+            return 0.0
+        theirs = b.given + b.nicknames
+        if not a.given or not theirs:
+            return (last + 0.5) / 2
+        best = [max(_given_similarity(x, y) for y in theirs) for x in a.given + a.nicknames]
+        given = 0.8 * max(best) + 0.2 * sum(best) / len(best)
+        return (last + given) / 2
+    return max(score(a, b), score(a.swapped(), b))
+
+
+def emails_in(text: str, limit: int = EMAIL_SCAN_CHARS) -> set:
+    """Email addresses (including "name (at) host" spellings) near the top of `text`."""
+    return {f"{user}@{host}".lower() for user, host in _EMAIL.findall(text[:limit])}
+
+
+def professor_id(email=None, name: str = "") -> str:
+    """
+    Stable professor id: derived from the Data.csv email, which survives name
+    spelling changes, or from the normalized name for people without one.
+    """
+    if isinstance(email, str) and email.strip():
+        basis = email.strip().lower()
+    else:
+        basis = "name:" + parse_name(name).key
+    return "p" + hashlib.sha256(basis.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class Match:
+    """
+    professor_id  None when the name did not resolve
+    confidence    1.0 for exact / email links, the similarity for fuzzy ones;
+                  for "new" and "ambiguous" the best candidate's similarity,
+                  i.e. how close the name came to being merged
+    method        exact | email | fuzzy | new | ambiguous | id
+    """
+    professor_id: str
+    confidence: float
+    method: str
+
+
+class NameResolver:
+    """
+    Resolves the names used by the scraped sources ("Alexander Y. Chen",
+    "Xianglin Li CV.pdf", ...) to professor ids.
+
+    Candidates come from blocking indexes rather than a scan of everyone:
+    the exact normalized name, then (surname, given initial), then phonetic
+    blocks keyed by (Soundex of surname, given initial) and (Soundex of
+    given name, first two letters of surname; this one catches surname
+    typos), and, if those find nothing, a trigram index over the name.
+    Each lookup scores a block's worth of names, so resolving n names grows
+    far slower than n².  A name that matches nobody well enough
+    can be linked through an email address in its text that belongs to a
+    Data.csv row.
+    """
+
+    def __init__(self):
+        self.people = {}                      # id → ParsedName
+        self.display = {}                     # id → name as first seen
+        self.exact = defaultdict(set)         # normalized key → ids
+        self.blocks = defaultdict(set)        # phonetic block → ids
+        self.grams = defaultdict(set)         # trigram → ids
+        self.emails = {}                      # email → id
+
+    @classmethod
+    def from_csv(cls, csv_file: str = "Data.csv"):
+        df = pd.read_csv(csv_file)
+        resolver = cls()
+        for first, last, email in zip(df["First Name:"], df["Last Name:"],
+                                      df["WashU Email Address:"]):
+            name = f"{first} {last}"
+            resolver.add(name, professor_id(email, name), email)
+        return resolver
+
+    # -- index ---------------------------------------------------------------
+    @staticmethod
+    def _block_keys(p: ParsedName, phonetic: bool) -> set:
+        given = p.given + p.nicknames
+        if not phonetic:
+            return {("surname", p.last, g[0]) for g in given} or {("surname", p.last, "")}
+        keys = {("last", soundex(p.last), g[0]) for g in given}
+        keys |= {("given", soundex(g), p.last[:2]) for g in given}
+        return keys or {("last", soundex(p.last), "")}
+
+    @staticmethod
+    def _trigrams(p: ParsedName) -> set:
+        s = f" {p.key} "
+        return {s[i:i + 3] for i in range(len(s) - 2)}
+
+    def add(self, name: str, pid: str = None, email=None) -> str:
+        parsed = parse_name(name)
+        pid = pid or professor_id(email, name)
+        self.people[pid] = parsed
+        self.display.setdefault(pid, name)
+        self.exact[parsed.key].add(pid)
+        for phonetic in (False, True):
+            for k in self._block_keys(parsed, phonetic) | self._block_keys(parsed.swapped(), phonetic):
+                self.blocks[k].add(pid)
+        for g in self._trigrams(parsed):
+            self.grams[g].add(pid)
+        if isinstance(email, str) and email.strip():
+            self.emails[email.strip().lower()] = pid
+        return pid
+
+    def candidates(self, parsed: ParsedName, phonetic: bool = True) -> set:
+        """Names sharing a block with `parsed`: same surname, or (`phonetic`) a sound-alike."""
+        found = set()
+        for k in self._block_keys(parsed, phonetic) | self._block_keys(parsed.swapped(), phonetic):
+            found |= self.blocks.get(k, set())
+        if not found and phonetic:
+            shared = Counter(pid for g in self._trigrams(parsed)
+                             if len(self.grams.get(g, ())) <= MAX_POSTING
+                             for pid in self.grams.get(g, ()))
+            found = {pid for pid, _ in shared.most_common(GRAM_CANDIDATES)}
+        return found
+
+    # -- lookup --------------------------------------------------------------
+    def resolve(self, name: str, text: str = "") -> Match:
+        """Best professor for `name`; `text` (the entry's content) is searched for emails."""
+        if name in self.people:
+            return Match(name, 1.0, "id")
+        parsed = parse_name(name)
+        if not parsed.last:
+            return Match(None, 0.0, "new")
+        exact = self.exact.get(parsed.key, set())
+        if len(exact) == 1:
+            return Match(next(iter(exact)), 1.0, "exact")
+
+        # same-surname block first; the wider phonetic blocks only if that is not conclusive
+        for phonetic in (False, True):
+            scored = sorted(((name_similarity(parsed, self.people[pid]), pid)
+                             for pid in self.candidates(parsed, phonetic)), reverse=True)
+            best, pid = scored[0] if scored else (0.0, None)
+            runner_up = scored[1][0] if len(scored) > 1 else 0.0
+            if best >= MATCH_THRESHOLD and best - runner_up >= AMBIGUITY_MARGIN:
+                return Match(pid, round(best, 3), "fuzzy")
+
+        # an email of a Data.csv row, if that row agrees on the surname or a given name
+        for email in emails_in(text):
+            pid = self.emails.get(email)
+            if pid is None:
+                continue
+            other = self.people[pid]
+            if (_ratio(parsed.last, other.last) >= LAST_MIN
+                    or set(parsed.given + parsed.nicknames) & set(other.given + other.nicknames)):
+                return Match(pid, 1.0, "email")
+        ambiguous = best >= AMBIGUOUS_MIN or len(exact) > 1
+        return Match(None, round(best, 3), "ambiguous" if ambiguous else "new")
+
+    def resolve_or_add(self, name: str, text: str = "") -> Match:
+        """resolve(), registering unresolved names as new professors (by name-derived id)."""
+        match = self.resolve(name, text)
+        if match.professor_id is None:
+            # an ambiguous name stays apart from every candidate rather than
+            # being merged into the wrong one
+            match.professor_id = professor_id(None, name)
+            if match.professor_id not in self.people:
+                self.add(name, match.professor_id)
+        return match
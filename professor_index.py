@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+PROFESSOR_FILE = "professors.json"
+VECTORS_FILE = "professor_chunks.f16"
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+class ProfessorIndex:
+    """
+    Professor-level view of the chunk index.
+
+    Stage 1 shortlists professors by the cosine similarity of the query to
+    each professor's centroid (mean of their normalized chunk vectors), then
+    rescores the shortlist by their best single chunk (max pooling).  Stage 2
+    is free: the chunk that produced the max score is that professor's best
+    chunk.  Chunk vectors are stored grouped by professor as float16 and
+    memory-mapped, so a professor's chunks are one contiguous slice.
+    """
+
+    def __init__(self, ids, offsets, chunk_ids, vectors, fingerprint=""):
+        self.ids = ids                    # professor position → professor id
+        self.offsets = offsets            # professor p owns rows offsets[p]:offsets[p+1]
+        self.chunk_ids = chunk_ids        # row → docstore id
+        self.vectors = vectors            # (rows, dim) float16, normalized
+        self.fingerprint = fingerprint
+        self.professor_of = {cid: ids[p] for p in range(len(ids))
+                             for cid in chunk_ids[offsets[p]:offsets[p + 1]]}
+        centroids = np.stack([
+            _normalize(vectors[offsets[p]:offsets[p + 1]].astype(np.float32).mean(axis=0))
+            for p in range(len(ids))
+        ]) if ids else np.zeros((0, vectors.shape[1]), np.float32)
+        self.centroids = faiss.IndexFlatIP(centroids.shape[1])
+        self.centroids.add(centroids)
+
+    @classmethod
+    def build(cls, vectorstore, path, fingerprint="", vectors=None):
+        """
+        Group the vector store's chunks by professor and save them under `path`.
+        `vectors` are the chunk vectors in index order; if omitted they are read
+        back from the FAISS index, which only flat indexes can do exactly.
+        """
+        ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+        if vectors is None:
+            vectors = vectorstore.index.reconstruct_n(0, len(ids))
+        vectors = _normalize(vectors)
+        by_professor = {}
+        for row, doc_id in enumerate(ids):
+            pid = vectorstore.docstore.search(doc_id).metadata["professor_id"]
+            by_professor.setdefault(pid, []).append(row)
+
+        professors = sorted(by_professor)
+        order = [row for pid in professors for row in by_professor[pid]]
+        offsets = np.cumsum([0] + [len(by_professor[p]) for p in professors]).tolist()
+        chunk_ids = [ids[row] for row in order]
+
+        path = Path(path)
+        vectors[order].astype(np.float16).tofile(path / VECTORS_FILE)
+        (path / PROFESSOR_FILE).write_text(json.dumps({
+            "fingerprint": fingerprint, "dim": int(vectors.shape[1]),
+            "ids": professors, "offsets": offsets, "chunk_ids": chunk_ids,
+        }), "utf-8")
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        meta = json.loads((path / PROFESSOR_FILE).read_text("utf-8"))
+        vectors = np.memmap(path / VECTORS_FILE, dtype=np.float16, mode="r",
+                            shape=(len(meta["chunk_ids"]), meta["dim"]))
+        # versions built before professor ids grouped chunks by name
+        return cls(meta.get("ids", meta.get("names")), meta["offsets"], meta["chunk_ids"],
+                   vectors, meta["fingerprint"])
+
+    def search(self, query_vector, n: int = 10, shortlist: int = 3, allowed=None) -> list:
+        """
+        Top `n` professors as (professor id, score, [chunk ids, best first]).
+        The `shortlist` × n nearest centroids are rescored by max-pooled chunk similarity.
+        `allowed` (an array of professor positions) restricts the centroid search
+        itself, so a filter never shortens the result list.
+        """
+        q = _normalize(query_vector).reshape(1, -1)
+        m = min(len(self.ids) if allowed is None else len(allowed), n * shortlist)
+        if m == 0:
+            return []
+        params = None if allowed is None else faiss.SearchParameters(sel=faiss.IDSelectorBatch(allowed))
+        _, positions = self.centroids.search(q, m, params=params)
+
+        results = []
+        for p in positions[0]:
+            if p < 0:
+                continue
+            lo, hi = self.offsets[p], self.offsets[p + 1]
+            sims = self.vectors[lo:hi].astype(np.float32) @ q[0]
+            best = np.argsort(-sims)
+            results.append((self.ids[p], float(sims[best[0]]),
+                            [self.chunk_ids[lo + i] for i in best]))
+        results.sort(key=lambda r: r[1], reverse=True)
+        return results[:n]
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+
+class Uncached:
+    """
+    Returned by a get_or_compute `compute` to hand back a value without caching
+    it, e.g. a fallback answer from a failed call that a retry should replace.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query."""
+    return " ".join(query.lower().split())
+
+
+def query_hash(query: str) -> str:
+    return text_hash(normalize_query(query))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class TwoTierCache:
+    """
+    In-process LRU (with TTL) in front of an optional SQLite tier.
+
+    Keys are tuples of strings, prefixed with the current index version so a
+    rebuilt index never serves stale results.  Values must be JSON-serializable
+    when the SQLite tier is enabled.  Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 24 * 3600,
+                 sqlite_path: str = None, version: str = ""):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version
+        self._mem = OrderedDict()          # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS cache "
+                             "(key TEXT PRIMARY KEY, expires_at REAL, value TEXT)")
+            self._db.commit()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _key(self, parts) -> str:
+        return "\x1f".join((self.version, *map(str, parts)))
+
+    def set_version(self, version: str) -> None:
+        """
+        Switch to a new index version.  Entries from other versions could never
+        be hit again, so they are dropped from both tiers (along with expired ones).
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            self._mem.clear()
+            if self._db is not None:
+                prefix = version + "\x1f"
+                self._db.execute("DELETE FROM cache WHERE expires_at < ? OR substr(key, 1, ?) != ?",
+                                 (time.time(), len(prefix), prefix))
+                self._db.commit()
+
+    def get(self, parts):
+        key, now = self._key(parts), time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and hit[0] > now:
+                self._mem.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return hit[1]
+            self._mem.pop(key, None)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT expires_at, value FROM cache WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None and row[0] > now:
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.counters["disk_hits"] += 1
+                    return value
+            self.counters["misses"] += 1
+            return MISS
+
+    def put(self, parts, value) -> None:
+        key, expires_at = self._key(parts), time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                                 (key, expires_at, json.dumps(value, ensure_ascii=False)))
+                self._db.commit()
+
+    def _remember(self, key, expires_at, value):
+        self._mem[key] = (expires_at, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def get_or_compute(self, parts, compute):
+        """Cached value for `parts`, else `compute()`'s, stored unless wrapped in Uncached."""
+        value = self.get(parts)
+        if value is MISS:
+            value = compute()
+            if isinstance(value, Uncached):
+                return value.value
+            self.put(parts, value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = sum(self.counters.values())
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        return {**self.counters, "entries": len(self._mem),
+                "hit_rate": hits / lookups if lookups else 0.0}
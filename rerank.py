@@ -0,0 +1,178 @@
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+from tracing import span, traced_invoke
+
+SNIPPET_CHARS = 2000   # per candidate, in the single batched prompt
+KEEP_THRESHOLD = 0.5   # local scorers keep candidates scoring at least this
+
+
+@dataclass
+class RerankResult:
+    doc: object
+    score: float        # 0–1, higher is more relevant
+    keep: bool
+    rationale: str = ""
+    degraded: bool = False   # the reranker failed; kept in retrieval order, unscored
+
+
+# ------------------------------------------------------------------
+# 1.  One-call LLM reranker: scores, keep/drop and rationale as JSON
+# ------------------------------------------------------------------
+RERANK_PROMPT = """You are matching a user's research inquiry to a list of candidate researchers.
+
+For every candidate, judge whether their expertise meaningfully aligns with the inquiry.
+Respond with JSON only, in this shape:
+{{"results": [{{"id": <candidate id>, "score": <0-100>, "keep": <true|false>,
+  "rationale": "<2-3 sentences on how their work matches the inquiry; focus on the matching components>"}}]}}
+Include every candidate exactly once.
+
+User inquiry:
+{query}
+
+Candidates:
+{candidates}
+"""
+
+
+class LLMReranker:
+    """Rerank and explain all candidates in a single structured LLM call."""
+
+    def __init__(self, llm):
+        self.llm = llm.bind(response_format={"type": "json_object"})
+
+    def prompt(self, query, docs) -> str:
+        candidates = "\n\n".join(
+            f"[id {i}] {doc.metadata.get('name', 'N/A')}\n{doc.page_content[:SNIPPET_CHARS]}"
+            for i, doc in enumerate(docs)
+        )
+        return RERANK_PROMPT.format(query=query, candidates=candidates)
+
+    def rerank(self, query, docs) -> list[RerankResult]:
+        reply = traced_invoke("rerank", self.llm, self.prompt(query, docs))
+        text = reply.content if hasattr(reply, "content") else reply
+        return parse_rerank_json(text, docs)
+
+
+def parse_rerank_json(text: str, docs) -> list[RerankResult]:
+    """
+    Map the model's JSON back onto `docs`; candidates it skipped are dropped.
+    A reply with no usable results (malformed or truncated JSON) is a failure,
+    not a verdict: every candidate is then kept in retrieval order, unscored
+    and marked `degraded`.
+    """
+    try:
+        rows = json.loads(text).get("results", [])
+    except (json.JSONDecodeError, AttributeError):
+        rows = []
+    by_id = {}
+    for row in rows if isinstance(rows, list) else []:
+        try:
+            by_id[int(row["id"])] = row
+        except (KeyError, TypeError, ValueError):
+            continue
+    if docs and not by_id:
+        logging.warning(f"unusable rerank reply, keeping retrieval order: {str(text)[:200]!r}")
+        return [RerankResult(doc, 0.0, True, "", degraded=True) for doc in docs]
+
+    out = []
+    for i, doc in enumerate(docs):
+        row = by_id.get(i)
+        if row is None:
+            out.append(RerankResult(doc, 0.0, False, ""))
+            continue
+        score = max(0.0, min(1.0, float(row.get("score", 0)) / 100))
+        out.append(RerankResult(doc, score, bool(row.get("keep", False)),
+                                str(row.get("rationale", "")).strip()))
+    return out
+
+
+# ------------------------------------------------------------------
+# 2.  Local scorers (no API call) – keep/drop only, no rationale
+# ------------------------------------------------------------------
+class CrossEncoderReranker:
+    """sentence-transformers cross-encoder; scores are squashed to 0–1."""
+
+    def __init__(self, model_name="cross-encoder/ms-marco-MiniLM-L-6-v2",
+                 threshold=KEEP_THRESHOLD):
+        from sentence_transformers import CrossEncoder   # optional dependency
+        self.model = CrossEncoder(model_name)
+        self.threshold = threshold
+
+    def rerank(self, query, docs) -> list[RerankResult]:
+        import math
+        with span("rerank_local"):
+            logits = self.model.predict([(query, d.page_content[:SNIPPET_CHARS]) for d in docs])
+        scores = [1 / (1 + math.exp(-float(x))) for x in logits]
+        return [RerankResult(d, s, s >= self.threshold) for d, s in zip(docs, scores)]
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class StubReranker:
+    """Query-term overlap; deterministic and free, for offline benchmarking."""
+
+    def __init__(self, threshold=0.15):
+        self.threshold = threshold
+
+    def rerank(self, query, docs) -> list[RerankResult]:
+        terms = {w for w in _WORD.findall(query.lower()) if len(w) > 3}
+        out = []
+        with span("rerank_local"):
+            for d in docs:
+                words = set(_WORD.findall(d.page_content.lower()))
+                s = len(terms & words) / len(terms) if terms else 0.0
+                out.append(RerankResult(d, s, s >= self.threshold))
+        return out
+
+
+def get_reranker(kind: str, llm=None):
+    if kind == "llm":
+        return LLMReranker(llm)
+    if kind == "cross-encoder":
+        return CrossEncoderReranker()
+    if kind == "stub":
+        return StubReranker()
+    raise ValueError(f"unknown reranker: {kind!r}")
+
+
+def rerank(reranker, query, docs) -> list[RerankResult]:
+    """Run `reranker` and return only the kept candidates, best first."""
+    results = reranker.rerank(query, docs)
+    return sorted((r for r in results if r.keep), key=lambda r: r.score, reverse=True)
+
+
+# ------------------------------------------------------------------
+# 3.  Offline benchmark:  python rerank.py --scorer stub
+# ------------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+    from types import SimpleNamespace
+
+    ap = argparse.ArgumentParser(description="Time a local reranker on combined.json")
+    ap.add_argument("--scorer", default="stub", choices=["stub", "cross-encoder"])
+    ap.add_argument("--query", default="biomedical imaging optical coherence tomography "
+                                        "photonic chip heart organoid 3D imaging")
+    ap.add_argument("--candidates", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with open("combined.json", encoding="utf-8") as f:
+        corpus = json.load(f)
+    docs = [SimpleNamespace(page_content=text[:1000], metadata={"name": name})
+            for name, text in list(corpus.items())[:args.candidates]]
+
+    reranker = get_reranker(args.scorer)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        kept = rerank(reranker, args.query, docs)
+    per_call = (time.perf_counter() - t0) / args.repeat
+
+    print(f"{args.scorer}: {per_call * 1000:.2f} ms per call, "
+          f"kept {len(kept)}/{len(docs)}")
+    for r in kept:
+        print(f"  {r.score:.2f}  {r.doc.metadata['name']}")
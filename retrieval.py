@@ -0,0 +1,147 @@
+import logging
+
+import numpy as np
+
+from faiss_index import search_params
+from tokens import estimate_tokens
+from tracing import model_name, span
+
+RRF_K = 60          # standard reciprocal-rank-fusion damping constant
+MODES = ("hybrid", "vector", "lexical")
+
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K) -> list:
+    """Fuse several ranked id lists into one, best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class SearchResults(list):
+    """
+    Retrieved documents, best first.  `degraded` is set when the query
+    embedding failed and a hybrid search answered from BM25 alone, so callers
+    can avoid caching a result that will be better once the API is back.
+    """
+
+    def __init__(self, docs=(), degraded: bool = False):
+        super().__init__(docs)
+        self.degraded = degraded
+
+
+class HybridRetriever:
+    """
+    FAISS similarity fused with local BM25 via reciprocal rank fusion.
+
+    mode "lexical" answers from BM25 alone, with no embedding call; "hybrid"
+    also drops to lexical if the embedding request fails (and marks its
+    SearchResults `degraded`).
+    """
+
+    def __init__(self, vectorstore, bm25, mode: str = "hybrid", k: int = 10,
+                 fetch_k: int = 30, professors=None, facets=None):
+        if mode not in MODES:
+            raise ValueError(f"unknown retrieval mode: {mode!r}")
+        self.vectorstore = vectorstore
+        self.bm25 = bm25
+        self.mode = mode
+        self.k = k
+        self.fetch_k = fetch_k
+        self.professors = professors      # ProfessorIndex, for search_professors
+        self.facets = facets              # FacetIndex, for `filters`
+
+    def _select(self, filters):
+        if not filters:
+            return None
+        if self.facets is None:
+            raise ValueError("this index has no facets to filter on")
+        return self.facets.select(filters)
+
+    def _doc(self, doc_id):
+        return self.vectorstore.docstore.search(doc_id)
+
+    def embed_query(self, query: str):
+        embedder = self.vectorstore.embedding_function
+        with span("embed_query", model_name(embedder)) as s:
+            s.prompt_tokens, s.estimated = estimate_tokens(query), True
+            return embedder.embed_query(query)
+
+    def vector_ids(self, query: str, k: int, selection=None) -> list:
+        qvec = self.embed_query(query)
+        with span("vector_search"):
+            if selection is None:
+                docs = self.vectorstore.similarity_search_by_vector(qvec, k=k)
+                return [d.id for d in docs]
+            # prefilter: FAISS only visits the selected rows
+            index = self.vectorstore.index
+            _, rows = index.search(np.asarray([qvec], dtype=np.float32), k,
+                                   params=search_params(index, selection.rows))
+            return [self.vectorstore.index_to_docstore_id[r] for r in rows[0] if r >= 0]
+
+    def lexical_ids(self, query: str, k: int, selection=None) -> list:
+        allowed = None if selection is None else selection.chunk_ids
+        with span("bm25_search"):
+            return [doc_id for doc_id, _ in self.bm25.search(query, k, allowed)]
+
+    def invoke(self, query: str, filters: dict = None) -> list:
+        """Top-k chunks; `filters` ({facet: [values]}) restricts the search itself."""
+        selection = self._select(filters)
+        degraded = False
+        if self.mode == "vector":
+            ranked = self.vector_ids(query, self.k, selection)
+        elif self.mode == "lexical":
+            ranked = self.lexical_ids(query, self.k, selection)
+        else:
+            lexical = self.lexical_ids(query, self.fetch_k, selection)
+            try:
+                vector = self.vector_ids(query, self.fetch_k, selection)
+            except Exception as e:
+                logging.warning(f"query embedding failed, answering lexically: {e}")
+                vector, degraded = [], True
+            ranked = reciprocal_rank_fusion([vector, lexical])
+        return SearchResults([self._doc(i) for i in ranked[:self.k]], degraded)
+
+    def search_professors(self, query: str, n: int = 10, filters: dict = None) -> list:
+        """
+        Best chunk for each of the top `n` distinct professors.
+
+        Vector side ranks professors through the ProfessorIndex; lexical side
+        groups BM25 hits by professor.  Both professor rankings and each
+        professor's chunk rankings are fused with RRF.  `filters` is applied
+        inside both searches, not to their results.
+        """
+        professor_of = self.professors.professor_of
+        professor_rankings, chunk_rankings = [], {}
+        degraded = False
+        selection = self._select(filters)
+        if selection is not None and not selection.ids:
+            return SearchResults()
+
+        if self.mode != "lexical":
+            try:
+                qvec = self.embed_query(query)
+                with span("vector_search"):
+                    found = self.professors.search(
+                        qvec, n, allowed=None if selection is None else selection.professors)
+            except Exception as e:
+                if self.mode == "vector":
+                    raise
+                logging.warning(f"query embedding failed, answering lexically: {e}")
+                found, degraded = [], True
+            professor_rankings.append([pid for pid, _, _ in found])
+            for pid, _, chunk_ids in found:
+                chunk_rankings.setdefault(pid, []).append(chunk_ids)
+
+        if self.mode != "vector":
+            grouped = {}
+            for doc_id in self.lexical_ids(query, self.fetch_k * n, selection):
+                grouped.setdefault(professor_of[doc_id], []).append(doc_id)
+            professor_rankings.append(list(grouped))
+            for pid, chunk_ids in grouped.items():
+                chunk_rankings.setdefault(pid, []).append(chunk_ids)
+
+        professors = reciprocal_rank_fusion(professor_rankings)[:n]
+        return SearchResults([self._doc(reciprocal_rank_fusion(chunk_rankings[pid])[0])
+                              for pid in professors], degraded)
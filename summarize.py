@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from call_pool import POOL, CallPool, PoolBusy
+from query_cache import MISS, query_hash, text_hash
+from tracing import traced_invoke
+
+CALL_TIMEOUT = 45      # seconds before a single summary is given up on
+SNIPPET_CHARS = 8290   # how much of the CV chunk goes into the prompt
+
+
+def summary_prompt(query: str, doc) -> str:
+    """Prompt asking the LLM why `doc`'s professor matches `query`."""
+    metadata = doc.metadata
+    snippet = doc.page_content[:SNIPPET_CHARS]
+    return (
+        f"Research Query: '{query}'.\n"
+        f"Professor: {metadata.get('name', 'N/A')}.\n"
+        f"CV Snippet: {snippet}\n\n"
+        "Based on the research query and the attached CV above, please provide a short summary "
+        "explaining why this professor was selected, highlighting how the CV content matches "
+        "the research interests. Focus on the positives and the matching components."
+    )
+
+
+def summarize_one(llm, query: str, doc) -> str:
+    result = traced_invoke("summary_call", llm, summary_prompt(query, doc))
+    return result.content if hasattr(result, "content") else result
+
+
+def summary_cache_key(query: str, doc) -> tuple:
+    return ("summary", query_hash(query), doc.metadata.get("name", ""), text_hash(doc.page_content))
+
+
+def stream_summaries(llm, query, docs, cancel: threading.Event = None,
+                     timeout: float = CALL_TIMEOUT, cache=None, pool: CallPool = None):
+    """
+    Summarize every doc concurrently and yield `(rank, doc, summary)` in
+    completion order, so the caller can show each result as soon as it lands.
+
+    Calls run on the process-wide `pool`, so a summary another session is
+    already computing is shared rather than requested twice.  A call still
+    running `timeout` seconds after it started is abandoned and yields a
+    placeholder.  Setting `cancel` (or closing the generator, which Streamlit
+    does when the user reruns the script) drops queued calls nobody else is
+    waiting for.  Summaries found in `cache` (a TwoTierCache) are yielded first.
+    """
+    cancel = cancel or threading.Event()
+    pool = pool or POOL
+
+    todo = []
+    for rank, doc in enumerate(docs, start=1):
+        hit = cache.get(summary_cache_key(query, doc)) if cache is not None else MISS
+        if hit is MISS:
+            todo.append((rank, doc))
+        else:
+            yield rank, doc, hit
+
+    def run(doc):
+        summary = summarize_one(llm, query, doc)
+        if cache is not None and summary:
+            cache.put(summary_cache_key(query, doc), summary)
+        return summary
+
+    futures = {}
+    for rank, doc in todo:
+        key = summary_cache_key(query, doc)
+        try:
+            futures[pool.submit(key, run, doc)] = (rank, doc, key)
+        except PoolBusy:
+            yield rank, doc, "(summary unavailable: too many searches running, try again shortly)"
+    pending = set(futures)
+    try:
+        while pending and not cancel.is_set():
+            done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for fut in done:
+                rank, doc, _ = futures[fut]
+                try:
+                    summary = fut.result()
+                except Exception as e:
+                    summary = f"(summary unavailable: {e})"
+                yield rank, doc, summary
+
+            now = time.monotonic()
+            for fut in [f for f in pending if f.started and now - f.started > timeout]:
+                pending.discard(fut)
+                rank, doc, _ = futures[fut]
+                yield rank, doc, f"(summary timed out after {timeout:.0f}s)"
+    finally:
+        cancel.set()
+        for fut in pending:
+            pool.release(futures[fut][2], fut)
@@ -1,16 +1,20 @@
 import json
+import os
 import re
 from pathlib import Path
 
 import pandas as pd
 from langchain_community.document_loaders import ScrapingAntLoader
 
+from fetch_cache import FetchCache
+
 # ------------------------------------------------------------------
 # config
 # ------------------------------------------------------------------
 CSV_PATH  = "Data.csv"
 OUT_PATH  = "web_data.json"
-API_KEY   = "cd2d9aca82fc4ce08088958e5ddefa1b"   # ScrapingAnt key
+API_KEY   = os.environ["SCRAPINGANT_API_KEY"]     # never commit the key
+MAX_AGE   = 7 * 86400      # ScrapingAnt can't revalidate – reuse pages this fresh
 
 URL_RE = re.compile(
     r"""(?xi)
@@ -43,6 +47,7 @@ last_col  = next(c for c in df.columns if "last name"  in c)
 url_cols  = [c for c in df.columns if any(k in c for k in ("webpage", "other"))]
 
 output = {}
+cache  = FetchCache(".scrapingant_cache.sqlite")   # stores rendered text, not HTML
 
 for _, row in df.iterrows():
     fullname = f"{row.get(first_col, '')} {row.get(last_col, '')}".strip()
@@ -54,9 +59,22 @@ for _, row in df.iterrows():
         output[fullname] = ""
         continue
 
-    loader     = ScrapingAntLoader(urls, api_key=API_KEY, continue_on_failure=True)
-    documents  = loader.load()
-    page_texts = [doc.page_content for doc in documents]
+    # reuse fresh pages, skip URLs still in the negative cache, fetch the rest
+    cached  = {u: cache.fresh(u, MAX_AGE) for u in urls}
+    to_load = [u for u in urls if cached[u] is None and not cache.skip_reason(u)]
+
+    if to_load:
+        loader    = ScrapingAntLoader(to_load, api_key=API_KEY, continue_on_failure=True)
+        documents = loader.load()
+        loaded    = {doc.metadata.get("url"): doc.page_content for doc in documents}
+        for u in to_load:
+            if u in loaded:
+                cache.store(u, loaded[u])
+                cached[u] = loaded[u]
+            else:
+                cache.record_failure(u, "ScrapingAnt load failed")
+
+    page_texts = [cached[u] for u in urls if cached[u] is not None]
 
     output[fullname] = "\n\n".join(page_texts)
 
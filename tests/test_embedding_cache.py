@@ -0,0 +1,75 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+
+from embedding_pipeline import EmbeddingPipeline
+from index_store import EmbeddingCache
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class Fake:
+    """Deterministic 4-d embeddings: a text's vector is derived from its characters."""
+    calls = 0
+
+    def embed_documents(self, texts):
+        Fake.calls += 1
+        return [[float(ord(t[0])), float(len(t)), float(ord(t[-1])), 1.0] for t in texts]
+
+
+def expected(text):
+    return Fake().embed_documents([text])[0]
+
+
+def crash_between_writes(path, keys, texts):
+    """Run a pipeline in a child process that dies after the vectors are written, before the keys."""
+    script = textwrap.dedent(f"""
+        import builtins, os, sys
+        sys.path.insert(0, {str(ROOT)!r})
+        sys.path.insert(0, {str(Path(__file__).parent)!r})
+        from embedding_pipeline import EmbeddingPipeline
+        from index_store import EmbeddingCache
+        from test_embedding_cache import Fake
+
+        real_open = builtins.open
+        def dying_open(file, mode="r", *args, **kwargs):
+            if str(file).endswith("keys.txt") and "a" in mode:
+                os._exit(3)
+            return real_open(file, mode, *args, **kwargs)
+        builtins.open = dying_open
+
+        EmbeddingPipeline(Fake(), EmbeddingCache({str(path)!r})).run({keys!r}, {texts!r})
+    """)
+    assert subprocess.run([sys.executable, "-c", script]).returncode == 3
+
+
+def test_torn_append_is_cut_back(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    cache.add(["a", "b"], [expected("aa"), expected("bbb")])
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(np.array([9, 9, 9, 9], dtype=np.float32).tobytes())      # a row without its key
+
+    cache = EmbeddingCache(tmp_path)
+    assert len(cache) == 2
+    cache.add(["c"], [[0, 0, 1, 0]])
+    assert EmbeddingCache(tmp_path).get("c").tolist() == [0, 0, 1, 0]
+
+
+def test_resume_after_crash_between_vector_and_key_write(tmp_path):
+    done = ["alpha", "beta"]
+    EmbeddingPipeline(Fake(), EmbeddingCache(tmp_path)).run(done, done)
+    crash_between_writes(tmp_path, ["gamma", "delta"], ["gamma", "delta"])
+
+    # the crashed batch's rows are dropped on reopen and embedded again
+    cache = EmbeddingCache(tmp_path)
+    assert sorted(cache.rows) == done
+    todo = ["gamma", "delta", "epsilon"]
+    EmbeddingPipeline(Fake(), cache).run(todo, todo)
+
+    cache = EmbeddingCache(tmp_path)
+    assert len(cache) == 5
+    for text in done + todo:
+        assert cache.get(text).tolist() == expected(text)
@@ -0,0 +1,63 @@
+"""
+googlescholar.scrape_all against saved Scholar profile pages served locally.
+Needs selenium and a Chrome / Chromium binary; set CHROMEDRIVER to a driver
+to avoid webdriver-manager's download.
+"""
+import functools
+import json
+import os
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("selenium")
+if not any(shutil.which(b) for b in ("google-chrome", "chromium", "chromium-browser", "chrome")):
+    pytest.skip("no Chrome / Chromium binary", allow_module_level=True)
+
+import googlescholar  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "scholar"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def scholar_url():
+    handler = functools.partial(QuietHandler, directory=str(FIXTURES))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_scrape_all_loads_every_publication_and_checkpoints(scholar_url, tmp_path):
+    urls = [f"{scholar_url}/chen.html", f"{scholar_url}/li.html"]
+    checkpoint = tmp_path / "all_scholars.jsonl"
+    driver = os.environ.get("CHROMEDRIVER")
+
+    results = googlescholar.scrape_all(urls, str(checkpoint), workers=2, driver_path=driver)
+
+    name, pubs = results[urls[0]]
+    assert name == "Yuran (Alex) Chen"
+    titles = pubs.split("; ")
+    assert len(titles) == 25                       # 20 shown + 5 behind "Show more"
+    assert titles[0] == "Pulsar magnetosphere simulations, part 0 (Cited by 200)"
+    assert titles[-1] == "Unpublished notes on radio transients (Cited by 0)"
+    assert results[urls[1]][0] == "Xianglin Li"
+    assert len(results[urls[1]][1].split("; ")) == 3
+
+    lines = [json.loads(line) for line in checkpoint.read_text("utf-8").splitlines()]
+    assert sorted(rec["url"] for rec in lines) == sorted(urls)
+
+    # a torn last line is ignored, and a rerun scrapes nothing
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        f.write('{"url": "http://example.invalid/x", "na')
+    assert googlescholar.scrape_all(urls, str(checkpoint), workers=2,
+                                    driver_path=driver) == results
@@ -0,0 +1,45 @@
+import json
+
+import pandas as pd
+
+from build_index import load_documents
+
+PEOPLE = [("Ada", "Lovelace"), ("Alan", "Turing"), ("Grace", "Hopper"),
+          ("Edsger", "Dijkstra"), ("Barbara", "Liskov"), ("Donald", "Knuth")]
+MENU = "Home | People | Research | Contact"
+
+
+def cv(first, last):
+    return "\n".join([
+        f"{first} {last}, Professor of Computing",
+        MENU,
+        "PUBLICATIONS",
+        *(f"{last} et al. Further results on the {last.lower()} problem, part {i}, "
+          f"Journal of {first} Studies {2000 + i}." for i in range(4)),
+        "HONORS AND AWARDS",
+        *(f"{last} Medal for distinguished work on {first.lower()} machines, "
+          f"awarded by the {last} Society in {2010 + i}." for i in range(4)),
+    ])
+
+
+def test_cv_headings_survive_boilerplate_removal(tmp_path):
+    pd.DataFrame({
+        "First Name:": [f for f, _ in PEOPLE], "Last Name:": [l for _, l in PEOPLE],
+        "WashU Email Address:": [f"{l.lower()}@wustl.edu" for _, l in PEOPLE],
+        "School:": "McKelvey School of Engineering", "Department:": "Computer Science",
+        "Title:": "Professor",
+    }).to_csv(tmp_path / "Data.csv", index=False)
+    (tmp_path / "combined.json").write_text(
+        json.dumps({f"{f} {l}": cv(f, l) for f, l in PEOPLE}), "utf-8")
+
+    report = {}
+    docs = load_documents(str(tmp_path / "Data.csv"), str(tmp_path / "missing.sqlite"),
+                          str(tmp_path / "combined.json"), dedup=True, report=report)
+
+    assert report["boilerplate_lines"] == len(PEOPLE)          # only the menu line
+    assert all(MENU not in d.page_content for d in docs)
+    for first, last in PEOPLE:
+        sections = {d.metadata["section"]: d.page_content for d in docs
+                    if d.metadata["name"] == f"{first} {last}"}
+        assert "Further results on the" in sections["PUBLICATIONS"]
+        assert f"{last} Medal" in sections["HONORS AND AWARDS"]
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from name_resolution import NameResolver, parse_name, professor_id
+
+DATA_CSV = Path(__file__).resolve().parent.parent / "Data.csv"
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return NameResolver.from_csv(DATA_CSV)
+
+
+@pytest.fixture
+def small():
+    r = NameResolver()
+    for name, email in [("Yuran (Alex) Chen", "yuran@wustl.edu"), ("Yang Chen", "yang@wustl.edu"),
+                        ("Jingyi Wang", "jingyi@wustl.edu"), ("Qingyun Li", "qingyun@wustl.edu"),
+                        ("Robert Smith", "rsmith@wustl.edu")]:
+        r.add(name, email=email)
+    return r
+
+
+def test_parse_name():
+    assert parse_name('Siyan "Stewart" Cao, MD PhD') == parse_name("Siyan (Stewart) Cao")
+    assert parse_name("Li, Xianglin").key == "xianglin li"
+    assert parse_name("Xianglin Li CV.pdf").key == "xianglin li"
+    assert parse_name("Dr. Xue-Yan O'Neil").key == "xueyan oneil"
+
+
+@pytest.mark.parametrize("name", ["Yuran (Alex) Chen", "Alexander Y. Chen", "Alex Chen", "Chen, Yuran"])
+def test_nickname_and_initials_resolve(small, name):
+    match = small.resolve(name)
+    assert match.professor_id == professor_id("yuran@wustl.edu")
+    assert match.method in ("exact", "fuzzy")
+
+
+def test_nickname_table(small):
+    assert small.resolve("Bob Smith").professor_id == professor_id("rsmith@wustl.edu")
+
+
+@pytest.mark.parametrize("name, other", [("Jing Wang", "Jingyi Wang"), ("Qing Li", "Qingyun Li")])
+def test_given_name_prefix_is_not_merged(small, name, other):
+    match = small.resolve(name)
+    assert match.professor_id is None
+    assert match.method == "ambiguous"
+    # ... unless their page carries the other person's email
+    email = {"Jingyi Wang": "jingyi@wustl.edu", "Qingyun Li": "qingyun@wustl.edu"}[other]
+    assert small.resolve(name, f"Contact: {email}").professor_id == professor_id(email)
+
+
+@pytest.mark.parametrize("name", ["Jing Wang", "Qing Li"])
+def test_given_name_prefix_against_data_csv(resolver, name):
+    assert resolver.resolve(name).method == "ambiguous"
+
+
+def test_alex_chen_against_data_csv(resolver):
+    match = resolver.resolve("Alexander Y. Chen")
+    assert resolver.display[match.professor_id] == "Yuran (Alex) Chen"
+
+
+def test_same_name_stays_ambiguous_without_email(resolver):
+    assert resolver.resolve("Wei Wang").method == "ambiguous"
+
+
+def test_resolve_or_add_keeps_unresolved_apart(small):
+    match = small.resolve_or_add("Jing Wang")
+    assert match.professor_id == professor_id(None, "Jing Wang")
+    assert small.resolve("Jing Wang").professor_id == match.professor_id
+    assert small.resolve("Jingyi Wang").professor_id == professor_id("jingyi@wustl.edu")
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+import pytest
+
+from rerank import parse_rerank_json, rerank
+
+DOCS = [SimpleNamespace(page_content=f"chunk {i}", metadata={"name": f"P{i}"}) for i in range(3)]
+
+
+class Replying:
+    def __init__(self, text):
+        self.text = text
+
+    def rerank(self, query, docs):
+        return parse_rerank_json(self.text, docs)
+
+
+def test_parses_scores_and_keeps():
+    text = ('{"results": [{"id": 2, "score": 90, "keep": true, "rationale": "fits"},'
+            ' {"id": 0, "score": 20, "keep": false, "rationale": "no"}]}')
+    kept = rerank(Replying(text), "q", DOCS)
+    assert [(r.doc, r.score, r.rationale, r.degraded) for r in kept] == [(DOCS[2], 0.9, "fits", False)]
+
+
+@pytest.mark.parametrize("text", ['{"results": [{"id": 2, "score": 90', "not json", "null",
+                                  '{"results": "oops"}', '{"answer": []}'])
+def test_unusable_reply_keeps_retrieval_order(text):
+    kept = rerank(Replying(text), "q", DOCS)
+    assert [r.doc for r in kept] == DOCS
+    assert all(r.degraded and r.rationale == "" for r in kept)
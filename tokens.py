@@ -0,0 +1,19 @@
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding():
+    """tiktoken's cl100k_base, or None if it is not installed / cannot be fetched."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of `text` (tiktoken if available, else ~4 characters per token)."""
+    enc = _encoding()
+    if enc is None:
+        return max(1, len(text) // 4)
+    return len(enc.encode(text, disallowed_special=()))
@@ -0,0 +1,214 @@
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger("research_collider.trace")
+
+# USD per 1M tokens: (prompt, completion)
+PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-3-small": (0.02, 0.0),
+}
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+@dataclass
+class Span:
+    stage: str
+    seconds: float = 0.0
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated: bool = False       # tokens counted locally rather than reported by the API
+
+    @property
+    def cost(self) -> float:
+        p, c = PRICES.get(self.model, (0.0, 0.0))
+        return (self.prompt_tokens * p + self.completion_tokens * c) / 1e6
+
+    def add_usage(self, message) -> None:
+        """Copy token counts off a LangChain AIMessage."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage:
+            self.prompt_tokens += usage.get("input_tokens", 0)
+            self.completion_tokens += usage.get("output_tokens", 0)
+            return
+        usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+
+
+class Trace:
+    """Spans recorded while one search runs; safe to add to from worker threads."""
+
+    def __init__(self, name: str = "search"):
+        self.name = name
+        self.spans = []
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.wall = 0.0
+
+    def add(self, span: Span) -> None:
+        with self.lock:
+            self.spans.append(span)
+
+    def breakdown(self) -> list:
+        """One row per stage: calls, summed seconds, tokens and cost."""
+        rows = {}
+        for s in self.spans:
+            row = rows.setdefault(s.stage, {"stage": s.stage, "calls": 0, "seconds": 0.0,
+                                            "prompt_tokens": 0, "completion_tokens": 0,
+                                            "cost_usd": 0.0})
+            row["calls"] += 1
+            row["seconds"] += s.seconds
+            row["prompt_tokens"] += s.prompt_tokens
+            row["completion_tokens"] += s.completion_tokens
+            row["cost_usd"] += s.cost
+        for row in rows.values():
+            row["seconds"] = round(row["seconds"], 3)
+            row["cost_usd"] = round(row["cost_usd"], 5)
+        return list(rows.values())
+
+    def finish(self) -> None:
+        """Close the trace: log it as one JSON line and fold it into the process metrics."""
+        self.wall = time.perf_counter() - self.start
+        logger.info(json.dumps({"event": self.name, "wall_seconds": round(self.wall, 3),
+                                "stages": self.breakdown(),
+                                "spans": [asdict(s) for s in self.spans]}))
+        METRICS.observe(self)
+        path = os.environ.get("TRACE_METRICS_FILE")
+        if path:
+            write_metrics(path)
+
+
+_metrics_lock = threading.Lock()
+
+
+def write_metrics(path: str) -> None:
+    """
+    Atomically replace `path` with the current metrics.  Sessions finishing
+    together take turns; a failed write is logged, never raised into the
+    search that triggered it.
+    """
+    tmp = None
+    try:
+        with _metrics_lock:
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False,
+                                             dir=os.path.dirname(os.path.abspath(path)),
+                                             prefix=".metrics-", suffix=".tmp") as f:
+                tmp = f.name
+                f.write(METRICS.openmetrics())
+            os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"could not write metrics to {path}: {e}")
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@contextmanager
+def tracing(name: str = "search"):
+    """Make a new Trace current for the duration of the block."""
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        trace.finish()
+
+
+@contextmanager
+def span(stage: str, model: str = ""):
+    """Time a block as one span of the current trace (a no-op outside `tracing`)."""
+    s = Span(stage, model=model)
+    start = time.perf_counter()
+    try:
+        yield s
+    finally:
+        s.seconds = time.perf_counter() - start
+        trace = _current.get()
+        if trace is not None:
+            trace.add(s)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Add an already-measured duration to the current trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(Span(stage, seconds))
+
+
+def model_name(llm) -> str:
+    """Model of a ChatOpenAI / OpenAIEmbeddings, also through .bind() wrappers."""
+    for obj in (llm, getattr(llm, "bound", None)):
+        name = getattr(obj, "model_name", None) or getattr(obj, "model", None)
+        if isinstance(name, str):
+            return name
+    return ""
+
+
+def traced_invoke(stage: str, llm, prompt):
+    """`llm.invoke(prompt)` recorded as a span with the reply's token usage."""
+    with span(stage, model_name(llm)) as s:
+        reply = llm.invoke(prompt)
+        s.add_usage(reply)
+    return reply
+
+
+# ------------------------------------------------------------------
+# Process-wide totals, rendered in OpenMetrics text format
+# ------------------------------------------------------------------
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.searches = 0
+        self.search_seconds = 0.0
+        self.stages = {}
+        self.gauges = {}          # name → callable returning {field: number}
+
+    def register(self, name: str, fn) -> None:
+        """Export `fn()`'s fields as research_collider_<name>_<field> gauges."""
+        self.gauges[name] = fn
+
+    def observe(self, trace: Trace) -> None:
+        with self.lock:
+            self.searches += 1
+            self.search_seconds += trace.wall
+            for row in trace.breakdown():
+                total = self.stages.setdefault(row["stage"], {k: 0 for k in row if k != "stage"})
+                for k in total:
+                    total[k] += row[k]
+
+    def openmetrics(self) -> str:
+        with self.lock:
+            lines = [
+                "# TYPE research_collider_searches counter",
+                f"research_collider_searches_total {self.searches}",
+                "# TYPE research_collider_search_seconds counter",
+                f"research_collider_search_seconds_total {self.search_seconds:.6f}",
+            ]
+            series = [("stage_calls", "calls"), ("stage_seconds", "seconds"),
+                      ("prompt_tokens", "prompt_tokens"),
+                      ("completion_tokens", "completion_tokens"), ("cost_usd", "cost_usd")]
+            for metric, key in series:
+                lines.append(f"# TYPE research_collider_{metric} counter")
+                for stage, total in sorted(self.stages.items()):
+                    lines.append(f'research_collider_{metric}_total{{stage="{stage}"}} {total[key]}')
+            for name, fn in sorted(self.gauges.items()):
+                for field, value in fn().items():
+                    lines.append(f"# TYPE research_collider_{name}_{field} gauge")
+                    lines.append(f"research_collider_{name}_{field} {value}")
+            lines.append("# EOF")
+            return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()